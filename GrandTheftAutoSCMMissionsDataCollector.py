@@ -1,7 +1,24 @@
 #!/usr/bin/env python3
 
+import contextlib
+import cProfile
+import difflib
+import glob
+import gzip
+import hashlib
+import importlib.util
+import json
+import mmap
 import os
-from termcolor import colored
+import pickle
+import re
+import sys
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import cached_property
 
 # Gets the absolute path of the project root
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
@@ -14,416 +31,3010 @@ mission_waits_dir = os.path.join(PROJECT_ROOT, "output", "Mission_Waits") # Miss
 trivial_dupes_dir = os.path.join(PROJECT_ROOT, "output", "Trivial_Dupes") # Trivial_Dupes directory path
 missions_compatibilities_dir = os.path.join(PROJECT_ROOT, "output", "Missions_Compatibilities") # Missions_Compatibilities directory path
 
-# Ensures that output directories exist
-os.makedirs(mission_waits_dir, exist_ok=True) # Creates the Mission_Waits directory if it doesn't exist
-os.makedirs(trivial_dupes_dir, exist_ok=True) # Creates the Trivial_Dupes directory if it doesn't exist
-os.makedirs(missions_compatibilities_dir, exist_ok=True) # Creates the Missions_Compatibilities directory if it doesn't exist
-
 # Output files paths 
 output_file_missions_waits = os.path.join(mission_waits_dir, "mission_waits_output.txt") # Mission waits output file path
 output_file_trivial_dupes = os.path.join(trivial_dupes_dir, "trivial_dupes_output.txt") # Trivial dupes output file path
 output_file_missions_compatibilities = os.path.join(missions_compatibilities_dir, "missions_compatibilities_output.txt") # Missions compatibilities output file path
 
+# Parse cache directory path and size cap
+scm_cache_dir = os.path.join(PROJECT_ROOT, "cache") # Parsed SCM files cache directory path (next to the output directory)
+CACHE_MAX_SIZE = 256 * 1024 * 1024 # Maximum total size of the cache files (the least recently used ones are evicted first)
+
 """ Functions """
 
-# Function to save mission stacks data to a file
-def SaveMissionStacksToFile(output_path, mission_stacks):
+# Console verbosity levels
+VERBOSITY_SILENT = 0 # Prints nothing
+VERBOSITY_SUMMARY = 1 # Prints the progress messages, the warnings and the summaries
+VERBOSITY_FULL = 2 # Prints every wait and every trivial dupe case too
+VERBOSITY_LEVELS = {"silent": VERBOSITY_SILENT, "summary": VERBOSITY_SUMMARY, "full": VERBOSITY_FULL}
+
+# Current console verbosity level
+console_verbosity = VERBOSITY_FULL
+
+# Size of the blocks written at once to the console and to the report files
+WRITE_CHUNK_SIZE = 1 << 20
+
+# Function to set the console verbosity level (also used as the initializer of the worker processes)
+def SetVerbosity(verbosity):
+    global console_verbosity
+    console_verbosity = verbosity
+
+# Function to check if the console output can be colored (only on a terminal, unless NO_COLOR is set)
+def UseColors():
+    return sys.stdout.isatty() and "NO_COLOR" not in os.environ
+
+# Function to color a text for the console (the text is left as is when colors are disabled, and termcolor is only imported when colors are used)
+def Colorize(text, color):
+    if not UseColors():
+        return text
+
+    from termcolor import colored
+    return colored(text, color)
+
+# Function to ensure that the output directories of the single file mode exist
+def CreateOutputDirectories():
+    os.makedirs(mission_waits_dir, exist_ok=True) # Creates the Mission_Waits directory if it doesn't exist
+    os.makedirs(trivial_dupes_dir, exist_ok=True) # Creates the Trivial_Dupes directory if it doesn't exist
+    os.makedirs(missions_compatibilities_dir, exist_ok=True) # Creates the Missions_Compatibilities directory if it doesn't exist
+
+# Function to print a message when the console verbosity level allows it
+def PrintMessage(message="", color=None, level=VERBOSITY_SUMMARY):
+    if console_verbosity >= level:
+        print(Colorize(message, color) if color else message)
+
+# Function to write text parts to a stream in large blocks, returning the number of characters written
+def WriteInChunks(stream, parts, chunk_size=WRITE_CHUNK_SIZE):
+    # Variables to store the current block and the written characters count
+    chunk = []
+    chunk_length = 0
+    written = 0
+
+    # Joins the parts until the block is big enough, then writes it
+    for part in parts:
+        chunk.append(part)
+        chunk_length += len(part)
+        if chunk_length >= chunk_size:
+            stream.write("".join(chunk))
+            written += chunk_length
+            chunk = []
+            chunk_length = 0
+
+    # Writes the last block
+    if chunk:
+        stream.write("".join(chunk))
+        written += chunk_length
+
+    # Returns the written characters count
+    return written
+
+# Function to get the path of a report file (with a .gz extension when it's compressed)
+def GetReportPath(output_path, compress=False):
+    return output_path + ".gz" if compress else output_path
+
+# Function to open a report file for writing (gzip compressed when requested)
+def OpenReportFile(output_path, compress=False):
+    if compress:
+        return gzip.open(GetReportPath(output_path, compress), "wt")
+    return open(output_path, "w", buffering=WRITE_CHUNK_SIZE)
+
+# Function to save mission stacks data to a file (gzip compressed when requested), returning the written file path
+def SaveMissionStacksToFile(output_path, mission_stacks, compress=False):
     # Opens the output file in write mode
-    with open(output_path, "w") as file:
-        # Writes the headers
-        headers = "{:<40}{:<15}".format("Mission Name", "Stack (Local Offset)") # Headers with wider spacing
-        
-        file.write(headers + "\n")
-        
-        # Adds a separator line below the headers
-        file.write("=" * 55 + "\n")  
-        
-        # Writes the mission stacks data
-        for mission, stack in mission_stacks.items():
-            row = "{:<40}{:<15}".format(mission, stack) # Formats the row with the mission name and the stack
-            
-            file.write(row + "\n")
+    with OpenReportFile(output_path, compress) as file:
+        # Writes the headers and the mission stacks data in one block
+        file.write(FormatMissionStacksHeaders() + FormatMissionStacksRows(mission_stacks))
 
-# Function to get all the mission stacks from the GTA SCM file
-def GetMissionStacks(file_path):
-    # Dictionary to store the mission stacks
-    mission_stacks = {}
-    
-    # Variable to store the current mission
-    current_mission = None
-    
-    # Variable to check if the current line is inside a mission block
-    in_mission = False
-    
-    # Opens the SCM file in read mode
-    with open(file_path, "r", encoding="utf-8") as file:
-        lines = file.readlines()
-    
-    # Iterates through the lines to extract the mission stacks
-    i = 0
-    
-    # Iterates through the lines
-    while i < len(lines):
-        line = lines[i].strip() # Removes the leading and trailing whitespaces
+    # Returns the written file path
+    return GetReportPath(output_path, compress)
 
-        # Checks for mission block start
-        if line.startswith("//-------------Mission"):
-            in_mission = True # Sets the in_mission flag to True
-            current_mission = "Unknown Mission" # Sets the current mission to "Unknown Mission"
-            
-            # Checks for the mission name in next line
-            if i + 1 < len(lines):
-                mission_line = lines[i + 1].strip() # Extracts the mission line
-                
-                # Checks if the mission line contains the mission name
-                if mission_line.startswith("// Originally:"):
-                    current_mission = mission_line.split(":", 1)[1].strip() # Extracts the mission name
-                    i += 1  # Skips the mission name line        
+# Function to format the headers of the mission stacks data
+def FormatMissionStacksHeaders():
+    headers = "{:<40}{:<15}".format("Mission Name", "Stack (Local Offset)") # Headers with wider spacing
+
+    # Returns the headers with a separator line below them
+    return headers + "\n" + "=" * 55 + "\n"
+
+# Function to format the rows of the mission stacks data
+def FormatMissionStacksRows(mission_stacks):
+    # Formats the rows with the mission name and the stack
+    return "".join("{:<40}{:<15}\n".format(mission, stack) for mission, stack in mission_stacks.items())
+
+# Record kinds yielded by the SCM scanner
+RECORD_MISSION = "mission" # Mission block header ("//-------------Mission N---------------")
+RECORD_SEPARATOR = "separator" # Any other block separator ("//-------------MAIN---------------")
+RECORD_NAME = "name" # Mission name line ("// Originally: Mission Name")
+RECORD_INSTRUCTION = "instruction" # Offset-bearing instruction line ("{global local} XXXX: ...")
+RECORD_WAIT = "wait" # Wait instruction line ("{global local} 0001: wait ...")
+RECORD_GOSUB = "gosub" # Gosub instruction line ("{global local} 0050: gosub ...")
+RECORD_LABEL = "label" # Label line (":LABEL")
+
+# Opcode stored for the offset-bearing lines whose opcode can't be read
+OPCODE_UNKNOWN = 0xFFFF
+
+# Class to store all the offset-bearing instructions of a GTA SCM file as compact columns
+class ScmInstructionIndex:
+    def __init__(self, file_path):
+        # SCM file path (used to fetch the lines text lazily)
+        self.file_path = file_path
+
+        # Instruction columns (one item per instruction, in file order)
+        self.global_offsets = array("i") # Global offsets (int32)
+        self.local_offsets = array("i") # Local offsets (int32)
+        self.opcodes = array("H") # Opcodes (uint16, including the negation bit)
+        self.mission_ids = array("H") # Mission ids pointing into the mission names table
+        self.line_positions = array("q") # Byte offsets of the lines in the SCM file
+
+        # Interned mission names table and its reverse lookup
+        self.mission_names = []
+        self.mission_ids_by_name = {}
+
+        # Checks if the index comes from a compiled SCM file (its line positions are byte offsets of instructions)
+        self.binary = False
+
+        # Instructions sorted by local offset (built on the first local offset lookup)
+        self.local_offset_order = None # Instruction indexes sorted by local offset (file order for equal offsets)
+        self.sorted_local_offsets = None # Local offsets in the same order
+
+    # Returns the number of instructions in the index
+    def __len__(self):
+        return len(self.global_offsets)
+
+    # Function to get the id of a mission name, adding it to the mission names table if it's new
+    def InternMission(self, mission_name):
+        mission_id = self.mission_ids_by_name.get(mission_name)
+
+        # Adds the mission name to the table if it isn't there yet
+        if mission_id is None:
+            mission_id = len(self.mission_names)
+            self.mission_names.append(mission_name)
+            self.mission_ids_by_name[mission_name] = mission_id
+
+        # Returns the mission id
+        return mission_id
+
+    # Function to append an instruction to the index
+    def Append(self, global_offset, local_offset, opcode, mission_id, line_position):
+        self.global_offsets.append(global_offset)
+        self.local_offsets.append(local_offset)
+        self.opcodes.append(opcode)
+        self.mission_ids.append(mission_id)
+        self.line_positions.append(line_position)
+
+    # Function to get the mission name of an instruction
+    def GetMissionName(self, index):
+        return self.mission_names[self.mission_ids[index]]
+
+    # Function to sort the instructions by local offset once, for the binary search lookups
+    def SortByLocalOffset(self):
+        # Sorts only if the index hasn't been sorted since the last append
+        if self.local_offset_order is None or len(self.local_offset_order) != len(self):
+            self.local_offset_order = array("i", sorted(range(len(self)), key=self.local_offsets.__getitem__))
+            self.sorted_local_offsets = array("i", [self.local_offsets[index] for index in self.local_offset_order])
+
+    # Function to get the indexes (in file order) of all the instructions with the given local offset
+    def FindLocalOffset(self, local_offset):
+        self.SortByLocalOffset()
+
+        # Finds the range of equal local offsets with binary searches
+        start = bisect_left(self.sorted_local_offsets, local_offset)
+        end = bisect_right(self.sorted_local_offsets, local_offset, start)
+
+        # Returns the instruction indexes of the range
+        return self.local_offset_order[start:end]
+
+    # Function to read the text of an instruction line from the SCM file (only when a report needs it)
+    def GetLineText(self, index):
+        # Formats the offsets and the opcode of the instructions from a compiled SCM file (there is no text line)
+        if self.binary:
+            return "{{{} {}}} {:04X}:".format(self.global_offsets[index], self.local_offsets[index], self.opcodes[index])
+
+        # Opens the SCM file in binary mode and reads the line at its byte offset
+        with open(self.file_path, "rb") as file:
+            file.seek(self.line_positions[index])
+
+            # Returns the line without the leading and trailing whitespaces
+            return file.readline().decode("utf-8").strip()
+
+# Compiled pattern of the relevant lines of a decompiled SCM file (instruction with its "{global local} opcode:" prefix, block separator, mission name or label), matched on raw bytes
+SCM_LINE_PATTERN = re.compile(
+    rb"^[ \t]*(?:"
+    rb"\{(\d+)(?: (\d+))?\}(?: ([0-9A-Fa-f]{4}):(?: (wait|gosub)\b)?(?:[^@\r\n]*@(\S+))?)?" # Instruction: global offset, local offset, opcode, wait/gosub keyword and first label operand
+    rb"|//-------------(Mission)?" # Block separator (mission header when followed by "Mission")
+    rb"|// Originally:[ \t]*([^\r\n]*)" # Mission name
+    rb"|:(\S+)" # Label
+    rb")[^\n]*\n?",
+    re.MULTILINE
+)
+
+# Function to scan a GTA SCM file (or the lines of a byte range of it) once and yield a typed record for every relevant line (kind, line number, line byte offset, offsets, opcode or name, and label operand)
+def ScanScmFile(file_path, start=0, end=None):
+    # Opens the SCM file in binary mode
+    with open(file_path, "rb") as file:
+        # Checks if the file is empty (an empty file can't be memory-mapped)
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+
+        # Memory-maps the SCM file (the lines are matched in place, the file is never fully loaded)
+        scm_buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # Variables to number the records so consumers can tell which lines are adjacent (a skipped line leaves a gap)
+    line_number = 0
+    previous_end = -1
+
+    # Iterates through the relevant lines of the byte range
+    matches = SCM_LINE_PATTERN.finditer(scm_buffer, start, len(scm_buffer) if end is None else end)
+    try:
+        for match in matches:
+            line_position = match.start() # Byte offset of the line
+            line_number += 1 if line_position == previous_end else 2
+            previous_end = match.end()
+            global_offset, local_offset, opcode, keyword, target, mission, mission_name, label = match.groups()
+
+            # Checks if the line is an instruction line
+            if global_offset is not None:
+                # Converts the offsets and the opcode to integers, and decodes the label operand
+                offsets = (int(global_offset), int(local_offset)) if local_offset is not None else (int(global_offset),)
+                opcode = int(opcode, 16) if opcode is not None else OPCODE_UNKNOWN
+                target = target.decode("utf-8") if target is not None else None
+
+                # Classifies the instruction by its opcode
+                if keyword == b"wait" and opcode == 0x0001:
+                    yield (RECORD_WAIT, line_number, line_position, offsets, opcode, target)
+                elif keyword == b"gosub" and opcode == 0x0050:
+                    yield (RECORD_GOSUB, line_number, line_position, offsets, opcode, target)
+                else:
+                    yield (RECORD_INSTRUCTION, line_number, line_position, offsets, opcode, target)
+
+            # Checks if the line indicates a mission name
+            elif mission_name is not None:
+                yield (RECORD_NAME, line_number, line_position, None, mission_name.strip().decode("utf-8"), None) # Yields the mission name
+
+            # Checks if the line is a label
+            elif label is not None:
+                yield (RECORD_LABEL, line_number, line_position, None, label.decode("utf-8"), None)
+
+            # Yields a mission header record or a plain separator record
+            elif mission is not None:
+                yield (RECORD_MISSION, line_number, line_position, None, None, None)
+            else:
+                yield (RECORD_SEPARATOR, line_number, line_position, None, None, None)
+    finally:
+        # Releases the matches before closing the memory-mapped file
+        match = matches = None
+        scm_buffer.close()
+
+# Registry of the analyzers that can run in a shared scan, by name
+SCM_ANALYZERS = {}
+
+# Function to register an analyzer class by its name (usable as a class decorator), returning the class
+def RegisterScmAnalyzer(analyzer_class):
+    SCM_ANALYZERS[analyzer_class.name] = analyzer_class
+    return analyzer_class
+
+# Base class of the analyzers run from a shared scan (subclasses register for opcodes and mission events, and get their records through the dispatch table)
+class ScmAnalyzer:
+    name = None # Name of the analyzer (also the name of its results and report)
+    opcodes = () # Opcodes whose instructions are dispatched to OnInstruction (without the negation bit)
+    all_instructions = False # Checks if every instruction is dispatched to OnInstruction (whatever its opcode)
+    events = () # Kinds of the mission records dispatched to OnEvent (RECORD_MISSION, RECORD_NAME or RECORD_SEPARATOR)
+    requires = () # Names of the analyzers whose results are needed by Finish (they are added to the scan when missing)
+
+    def __init__(self, file_path):
+        # SCM file path
+        self.file_path = file_path
+
+        # Results of the analyzer (set by RunScmAnalyzers after the scan)
+        self.result = None
+
+    # Function called for each mission record of the registered kinds (value is the mission name of a RECORD_NAME record)
+    def OnEvent(self, kind, line_number, line_position, value):
+        pass
+
+    # Function called for each instruction record of the registered opcodes with the current mission name, returning a function to call with the next record (or None)
+    def OnInstruction(self, record, mission_name):
+        return None
+
+    # Function called after the scan with the results of the other analyzers, returning the results of the analyzer
+    def Finish(self, results):
+        return None
+
+    # Function to save the results of the analyzer to its report under an output directory, returning the written file path (None if it has no report)
+    def Write(self, output_dir, compress=False):
+        return None
+
+# Function to run analyzers on the records of a single scan of a GTA SCM file, dispatching each record only to the analyzers registered for its opcode or event, and return their results by name
+def RunScmAnalyzers(file_path, analyzers, records=None):
+    # Adds the missing analyzers needed by the others (before them, so they finish first)
+    given_analyzers = {analyzer.name: analyzer for analyzer in analyzers}
+    analyzers_by_name = {}
+    def AddAnalyzer(analyzer):
+        for required_name in analyzer.requires:
+            if required_name not in analyzers_by_name:
+                AddAnalyzer(given_analyzers.get(required_name) or SCM_ANALYZERS[required_name](file_path))
+        analyzers_by_name.setdefault(analyzer.name, analyzer)
+    for analyzer in analyzers:
+        AddAnalyzer(analyzer)
+    analyzers = list(analyzers_by_name.values())
+
+    # Builds the dispatch table (instruction handlers by opcode, and mission event handlers by record kind)
+    dispatch_table = {}
+    instruction_handlers = [analyzer.OnInstruction for analyzer in analyzers if analyzer.all_instructions]
+    event_handlers = {}
+    for analyzer in analyzers:
+        if not analyzer.all_instructions:
+            for opcode in analyzer.opcodes:
+                dispatch_table.setdefault(opcode & 0x7FFF, []).append(analyzer.OnInstruction)
+        for kind in analyzer.events:
+            event_handlers.setdefault(kind, []).append(analyzer.OnEvent)
+
+    # Variables to store the current mission name and the handlers waiting for the next record
+    current_mission = "Unknown Mission"
+    next_record_handlers = []
+
+    # Iterates through the records of the single scan
+    for record in ScanScmFile(file_path) if records is None else records:
+        # Calls the handlers waiting for this record
+        if next_record_handlers:
+            handlers, next_record_handlers = next_record_handlers, []
+            for handler in handlers:
+                handler(record)
+
+        # Dispatches the mission records by kind
+        if record[3] is None:
+            if record[0] == RECORD_NAME:
+                current_mission = record[4] # Updates the current mission name
+            elif record[0] == RECORD_MISSION:
+                current_mission = "Unknown Mission" # Resets the current mission name at each mission block (a block without a name line doesn't take the name of the block before it, so every block parses the same alone)
+            for handler in event_handlers.get(record[0], ()):
+                handler(record[0], record[1], record[2], record[4])
             continue
 
+        # Dispatches the instruction records by opcode
+        for handler in instruction_handlers:
+            next_record_handler = handler(record, current_mission)
+            if next_record_handler is not None:
+                next_record_handlers.append(next_record_handler)
+        for handler in dispatch_table.get(record[4] & 0x7FFF, ()):
+            next_record_handler = handler(record, current_mission)
+            if next_record_handler is not None:
+                next_record_handlers.append(next_record_handler)
+
+    # Finishes the analyzers in order and returns their results
+    results = {}
+    for analyzer in analyzers:
+        analyzer.result = results[analyzer.name] = analyzer.Finish(results)
+    return results
+
+# Built-in analyzer building the instruction index of the instructions with two offsets
+@RegisterScmAnalyzer
+class ScmInstructionIndexAnalyzer(ScmAnalyzer):
+    name = "instructions"
+    all_instructions = True
+    events = (RECORD_MISSION, RECORD_NAME)
+
+    def __init__(self, file_path):
+        super().__init__(file_path)
+
+        # Index to store all the instructions with offsets and mission ids
+        self.instruction_index = ScmInstructionIndex(file_path)
+
+        # Variable to store the current mission id
+        self.current_mission_id = self.instruction_index.InternMission("Unknown Mission")
+
+    # Function to update the current mission id (reset at each mission block, like the current mission name of the scan)
+    def OnEvent(self, kind, line_number, line_position, value):
+        self.current_mission_id = self.instruction_index.InternMission(value if kind == RECORD_NAME else "Unknown Mission")
+
+    # Function to append the global and local offsets with the opcode, the current mission id and the line byte offset
+    def OnInstruction(self, record, mission_name):
+        offsets = record[3]
+        if len(offsets) == 2:
+            self.instruction_index.Append(offsets[0], offsets[1], record[4], self.current_mission_id, record[2])
+
+    # Function to return the instruction index
+    def Finish(self, results):
+        return self.instruction_index
+
+# Built-in analyzer counting the waits and pairing each one with the instruction on its next line
+@RegisterScmAnalyzer
+class ScmWaitsAnalyzer(ScmAnalyzer):
+    name = "waits"
+    opcodes = (0x0001,)
+
+    def __init__(self, file_path):
+        super().__init__(file_path)
+
+        # Variables to store the count of mission waits and the waits results
+        self.missions_waits_count = 0
+        self.waitsresults = []
+
+        # Variable to store the wait waiting for its next instruction line
+        self.pending_wait = None # (Line number, wait offsets, mission name) of the last wait
+
+    # Function to count a wait line and wait for its next instruction line
+    def OnInstruction(self, record, mission_name):
+        kind, line_number, _, offsets, _, _ = record
+        if kind == RECORD_WAIT and len(offsets) == 2:
+            self.missions_waits_count += 1 # Increments the count of waits lines
+            self.pending_wait = (line_number, offsets, mission_name)
+            return self.OnNextLine
+        return None
+
+    # Function to check if the line after a wait is its next instruction
+    def OnNextLine(self, record):
+        # Ensures the next instruction is on the following line and has two numbers
+        if record[1] == self.pending_wait[0] + 1 and record[3] is not None and len(record[3]) == 2:
+            self.waitsresults.append((self.pending_wait[1], record[3], self.pending_wait[2])) # Appends the wait line and the next instruction line with the mission name
+
+    # Function to return the waits count and the waits results sorted by global offset
+    def Finish(self, results):
+        self.waitsresults.sort(key=lambda x: x[0][0])
+        return self.missions_waits_count, self.waitsresults
+
+    # Function to save the mission waits report
+    def Write(self, output_dir, compress=False):
+        output_path = os.path.join(output_dir, "Mission_Waits", "mission_waits_output.txt")
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        return SaveMissionWaitsDataToFile(output_path, self.result[1], self.result[0], compress)
+
+# Built-in analyzer finding the stack of each mission (the local offset of the line after the first gosub of its block)
+@RegisterScmAnalyzer
+class ScmStacksAnalyzer(ScmAnalyzer):
+    name = "stacks"
+    opcodes = (0x0050,)
+    events = (RECORD_MISSION, RECORD_NAME, RECORD_SEPARATOR)
+
+    def __init__(self, file_path):
+        super().__init__(file_path)
+
+        # Dictionary to store the mission stacks
+        self.mission_stacks = {}
+
+        # Variables to track the mission block whose stack is being searched
+        self.stack_mission = None # Mission name of the current mission block
+        self.in_mission = False # Checks if the current line is inside a mission block
+        self.mission_header_line = None # Line number of the last mission block header
+
+        # Variables to store the last gosub and the line consumed by it
+        self.pending_gosub = None # Line number of the last gosub
+        self.consumed_line = None # Line number of the line right after the last gosub (it isn't tracked)
+
+    # Function to track the mission blocks
+    def OnEvent(self, kind, line_number, line_position, value):
+        # Skips the line consumed by a gosub
+        if line_number == self.consumed_line:
+            return
+
+        # Checks for mission block start
+        if kind == RECORD_MISSION:
+            self.in_mission = True # Sets the in_mission flag to True
+            self.stack_mission = "Unknown Mission" # Sets the stack mission to "Unknown Mission"
+            self.mission_header_line = line_number # Stores the line number of the mission block header
+
+        # Checks for the mission name right after the mission block header
+        elif kind == RECORD_NAME and self.mission_header_line is not None and line_number == self.mission_header_line + 1:
+            self.stack_mission = value # Extracts the mission name
+
         # Resets at end of mission block
-        if line.startswith("//-------------") and in_mission:
-            in_mission = False # Sets the in_mission flag to False
-            current_mission = None # Resets the current mission
-
-        # Looks for the gosub in mission block
-        if in_mission and current_mission:
-            # Checks for the  gosub line
-            if "0050: gosub" in line:
-                # Checks next line for valid offsets
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip() # Extracts the next line
-                    
-                    # Checks if the next line contains both "{" and "}"
-                    if "{" in next_line and "}" in next_line:
-                        offset_part = next_line.split("}")[0].strip("{").strip() # Extracts the numbers between "{}"
-                        offsets = offset_part.split() # Splits the offset part
-                        
-                        # Ensures that the line has exactly two integer numbers
-                        if len(offsets) == 2 and all(o.isdigit() for o in offsets):
-                            mission_stacks[current_mission] = offsets[1] # Adds the mission stack to the dictionary
-                            in_mission = False # Sets the in_mission flag to False
-                        else:
-                            # Prints a warning message if the offset format is invalid
-                            print(colored(f"⚠️ Invalid offset format in mission '{current_mission}' at line {i+1}", "yellow"))
-                
-                # Skips the next line
-                i += 1 
-                
-        # Increments the index 
-        i += 1
-    
-    # Returns the mission stacks dictionary
-    return mission_stacks
+        elif kind == RECORD_SEPARATOR and self.in_mission:
+            self.in_mission = False # Sets the in_mission flag to False
+            self.stack_mission = None # Resets the stack mission
 
-# Function to get all the lines from a GTA SCM file
-def GetAllLines(file_path):
-    # List to store all lines with offsets and mission names
-    all_lines = []
-    
-    # Variable to store the current mission name
-    current_mission = "Unknown Mission"
-    
-    # Opens the SCM file in read mode
-    with open(file_path, "r") as file:
-        # Iterates through the lines to extract the global and local offsets
-        for line in file:
-            # Checks if the line indicates a mission name
-            if line.startswith("// Originally:"):
-                current_mission = line.split(":", 1)[1].strip() # Extracts the mission name 
-                
-            # Checks if the line contains both "{" and "}"
-            if "{" in line and "}" in line:
-                offsets = line.split("}")[0].strip("{").split() # Extracts the numbers between "{}" (Offsets)
-                # Ensures that the line has exactly two integer numbers
-                if len(offsets) == 2:
-                    global_offset, local_offset = offsets # Extracts the global and local offsets 
-                    # Appends the line data with the current mission name                        
-                    all_lines.append(((global_offset, local_offset), line.strip(), current_mission)) # Appends the global and local offsets with the line and the current mission name
-    
-    # Returns all the lines with their global and local offsets and mission 
-    return all_lines
+    # Function to look for the gosub in mission block
+    def OnInstruction(self, record, mission_name):
+        if record[0] == RECORD_GOSUB and record[1] != self.consumed_line and self.in_mission and self.stack_mission:
+            self.pending_gosub = record[1] # Checks its next line on the next record
+            return self.OnNextLine
+        return None
 
-# Function to save mission waits data to a file
-def SaveMissionWaitsDataToFile(output_path, results, missions_waits_count):
-    # Opens the output file in write mode
-    with open(output_path, "w") as file:
-        # Writes the headers with wider spacing
-        headers = "{:<15}{:<40}{:<40}{:<40}{:<40}{:<40}".format(
-            "Wait Number", # Wait Number Header
-            "Global Offset of the Wait Instruction", # Global Offset of the Wait Instruction Header
-            "Local Offset of the Wait Instruction", # Local Offset of the Wait Instruction Header
-            "Global Offset of the Next Instruction", # Global Offset of the Next Instruction Header
-            "Local Offset of the Next Instruction", # Local Offset of the Next Instruction Header
-            "Mission Name" # Mission Name Header
-        )
-        
-        # Writes the headers
-        file.write(headers + "\n")
-        
-        # Adds a separator line below the headers
-        file.write("=" * 215 + "\n")  
-        
-        # Prints total missions_waits_count (optional)
-        print(f"Total Missions Waits Count: {missions_waits_count}\n")
+    # Function to check the next line of the gosub for valid offsets
+    def OnNextLine(self, record):
+        _, line_number, line_position, offsets, _, _ = record
+        if line_number != self.pending_gosub + 1:
+            return
+        self.consumed_line = line_number # The line right after the gosub is consumed by the gosub
 
-        # Variables to track the current mission and wait number
-        current_mission = None
-        wait_number = 0
-        
-        # Iterates through the results to write the data rows
-        for index, (wait_offsets, next_instruction_offsets, mission_name) in enumerate(results, start=1):
-            # Checks if the mission has changed
-            if mission_name != current_mission:
-                # Resets the wait number counter
-                wait_number = 0
-                
-                # Updates the current mission
-                current_mission = mission_name
-            
-            # Increments the wait number for the current mission
-            wait_number += 1
-            
-            # Formats the row
-            row = "{:<15}{:<40}{:<40}{:<40}{:<40}{:<40}".format(
-                wait_number, # Wait Number (resets for each mission
-                wait_offsets[0], # Global Offset of the Wait Instruction
-                wait_offsets[1], # Local Offset of the Wait Instruction
-                next_instruction_offsets[0], # Global Offset of the Next 
-                next_instruction_offsets[1], # Local Offset of the Next 
-                mission_name # Mission Name
-            )
-            
-            # Writes the data rows to the file
-            file.write(row + "\n")
+        if offsets is not None:
+            # Ensures that the line has exactly two integer numbers
+            if len(offsets) == 2:
+                self.mission_stacks[self.stack_mission] = offsets[1] # Adds the mission stack to the dictionary
+                self.in_mission = False # Sets the in_mission flag to False
+            else:
+                # Prints a warning message if the offset format is invalid
+                PrintMessage(f"⚠️ Invalid offset format in mission '{self.stack_mission}' at byte offset {line_position}", "yellow")
 
-# Function to save trivial dupes data to a file
-def SaveTrivialDupesDataToFile(output_path, matching_offsets, mission_stacks):
-    # Opens the output file in write mode
-    with open(output_path, "w") as file:
-        # Writes matching offsets section
-        if matching_offsets:
-            file.write("Matching trivial dupes found:\n\n")
-            # Iterates through the matching offsets and writes them to the file
-            for local_offset, cases in matching_offsets.items():
-                file.write(f"Local Offset: {local_offset}\n")
-                # Iterates through the cases and writes them to the file
-                for idx, case in enumerate(cases, start=1):
-                    # Extracts the cases
-                    ((wait_offsets1, next_instr1, mission1), (other_offsets, _, mission2)) = case
-                    file.write(f"  Case {idx}:\n") # Writes the case number
-                    file.write(f"    From Wait (Mission: {mission1}, Stack: {mission_stacks.get(mission1)}):\n") # Writes the first mission with the stack
-                    file.write(f"      Global Offset: {wait_offsets1[0]}, Local Offset: {wait_offsets1[1]}\n") # Writes the global and local offsets of the wait instruction
-                    file.write(f"      Next Instruction: Global Offset: {next_instr1[0]}, Local Offset: {next_instr1[1]}\n") # Writes the global and local offsets of the next instruction
-                    file.write(f"    Matches With (Mission: {mission2}, Stack: {mission_stacks.get(mission2)}):\n") # Writes the second mission with the stack
-                    file.write(f"      Global Offset: {other_offsets[0]}, Local Offset: {other_offsets[1]}\n\n") # Writes the global and local offsets of the matching case
-        else:
-            # Writes that no matching local offsets were found
-            file.write("No matching local offsets found.\n")
+    # Function to return the mission stacks
+    def Finish(self, results):
+        return self.mission_stacks
 
-# Function to find matching local offsets
-def FindMatchingLocalOffsets(results, all_lines):
-    # Dictionary to store the matching local offsets
-    offsets_matches = {}
-    
-    # Creates a dictionary to map local offsets to their corresponding lines and mission names
-    local_offset_map = {int(line_data[0][1]): line_data for line_data in all_lines}
-    
-    # Iterates through all lines to create the map
-    for wait_offsets, next_instr_offsets, mission_name in results:
-        local_offset1 = int(next_instr_offsets[1])
-        if local_offset1 in local_offset_map:
-            # Extracts the correct offsets from the local_offset_map
-            matching_line_data = local_offset_map[local_offset1] # Matching line data
-            matching_global_offset = matching_line_data[0][0]  # Global offset of the matching line
-            matching_local_offset = matching_line_data[0][1]  # Local offset of the matching line
-            matching_mission_name = matching_line_data[2]  # Mission name of the matching line
-            
-            # Checks if the matching offsets are different from the current wait offsets
-            if matching_global_offset != wait_offsets[0]:  
-                # Creates the matching offsets tuple with only the offset values
-                matching_offsets = (matching_global_offset, matching_local_offset)
-                offsets_matches.setdefault(local_offset1, []).append((
-                    (wait_offsets, next_instr_offsets, mission_name), # Current wait offsets
-                    (matching_offsets, None, matching_mission_name)   # Matching offsets
-                ))
-    
-    # Returns the dictionary with the matching local offsets
-    return offsets_matches
+    # Function to save the missions compatibilities report
+    def Write(self, output_dir, compress=False):
+        output_path = os.path.join(output_dir, "Missions_Compatibilities", "missions_compatibilities_output.txt")
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        return SaveMissionStacksToFile(output_path, self.result, compress)
 
-# Function to print the results of the waits offsets and the next instruction of the wait offsets
-def PrintResults(results, count, matching_offsets, mission_stacks):
-    print(colored("There are {} mission waits in the SCM.".format(count), "yellow"))
-    
-    print("")
+# Built-in analyzer matching the waits with the instructions of other missions at the same local offset (it only joins the results of the other built-in analyzers)
+@RegisterScmAnalyzer
+class ScmTrivialDupesAnalyzer(ScmAnalyzer):
+    name = "trivial_dupes"
+    requires = ("waits", "stacks", "instructions")
 
-    # Prints all the waits details
-    for index, (wait_offsets, next_instruction_offsets, mission_name) in enumerate(results, start=1):
-        print(colored(f"Wait N°{index} (Mission: {mission_name}):", "cyan")) # Prints the wait number and the mission name
-        
-        print("  Global Offset of the Wait Instruction: {}".format(wait_offsets[0])) # Prints the Global Offset of the Wait Instruction
-        print("  Local Offset of the Wait Instruction: {}".format(wait_offsets[1])) # Prints the Local Offset of the Wait Instruction
-        print("  Global Offset of the Next Instruction: {}".format(next_instruction_offsets[0])) # Prints the Global Offset of the Next Instruction
-        print("  Local Offset of the Next Instruction: {}".format(next_instruction_offsets[1])) # Prints the Local Offset of the Next Instruction
-        
-        print("")
-        
-    # Prints matching offsets section
-    if matching_offsets:
-        print(colored("The matching local offsets found in this SCM are:", "yellow"))
-        # Iterates through the matching offsets and prints them
-        for local_offset, cases in matching_offsets.items():
-            print(colored(f"Local Offset: {local_offset}", "cyan"))
-            # Iterates through the cases and prints them
-            for idx, case in enumerate(cases, start=1):
-                ((wait_offsets1, next_instr1, mission1), (other_offsets, _, mission2)) = case
-                print(colored(f"  Case {idx}:", "green")) # Prints the case number
-                print(f"    From Wait (Mission: {mission1}):") # Prints the mission name
-                print(f"      Mission Stack (Local Offset after first gosub): {mission_stacks[mission1]}") # Prints the mission stack of the first mission
-                print(f"      Global Offset: {wait_offsets1[0]}, Local Offset: {wait_offsets1[1]}") # Prints the Global and Local Offsets of the Wait Instruction
-                print(f"      Next Instruction: Global Offset: {next_instr1[0]}, Local Offset: {next_instr1[1]}") # Prints the Global and Local Offsets of the Next Instruction
-                print(f"    Matches With (Mission: {mission2}):") # Prints the mission name that matches with the previous one
-                print(f"      Mission Stack (Local Offset after first gosub): {mission_stacks[mission2]}") # Prints the mission stack of the second mission
-                print(f"      Global Offset: {other_offsets[0]}, Local Offset: {other_offsets[1]}") # Prints the Global and Local Offsets of the matching instruction
-                
-                print("")
-    else:
-        # Prints that no matching local offsets were found
-        print(colored("No matching local offsets found.", "red"))
-        
-        print("")
+    def __init__(self, file_path):
+        super().__init__(file_path)
 
-# Function to count the number of mission waits
-def MissionsWaitsCounter(file_path):
-    # Variable to store the count of mission waits
-    missions_waits_count = 0
-    
-    # Opens the SCM file in read mode and iterates through the lines to count the valid lines
-    with open(file_path, "r") as file:
-        # Iterates through the lines in the file
+        # Mission stacks of the report (from the stacks analyzer)
+        self.mission_stacks = {}
+
+    # Function to return the trivial dupes grouped by local offset
+    def Finish(self, results):
+        self.mission_stacks = results["stacks"] # Mission stacks of the report
+        return FindMatchingLocalOffsets(results["waits"][1], results["instructions"])
+
+    # Function to save the trivial dupes report
+    def Write(self, output_dir, compress=False):
+        output_path = os.path.join(output_dir, "Trivial_Dupes", "trivial_dupes_output.txt")
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        return SaveTrivialDupesDataToFile(output_path, self.result, self.mission_stacks, compress)
+
+# Function to collect the waits count, the waits, the mission stacks and the instruction index from a single scan of the GTA SCM file (or of a byte range of it)
+def CollectScmData(file_path, start=0, end=None):
+    # Returns the data collected from the records of the scan
+    return CollectScmRecords(file_path, ScanScmFile(file_path, start, end))
+
+# Function to collect the waits count, the waits, the mission stacks and the instruction index from the records of a SCM scanner
+def CollectScmRecords(file_path, records):
+    # Runs the built-in analyzers on the records
+    results = RunScmAnalyzers(file_path, [ScmWaitsAnalyzer(file_path), ScmStacksAnalyzer(file_path), ScmInstructionIndexAnalyzer(file_path)], records)
+    missions_waits_count, waitsresults = results["waits"]
+
+    # Returns the waits count, the waits, the mission stacks and the instruction index
+    return missions_waits_count, waitsresults, results["stacks"], results["instructions"]
+
+# Parse cache file format (bump the version whenever the layout or the parsing results change)
+CACHE_MAGIC = b"SCMCACHE"
+CACHE_FORMAT_VERSION = 3
+CACHE_HEADER = struct.Struct("<8sIIIIII") # Magic, version, waits count, instructions, waits, stacks, mission names length
+CACHE_INDEX_FILE_NAME = "cache_index.json" # Maps each SCM file path to its size, mtime and content hash
+CACHE_FILE_EXTENSION = ".scmcache"
+
+# Parameter data types of the compiled GTA III and Vice City SCM (any other byte starts an 8 bytes string)
+SCM_TYPE_END = 0x00 # End of a variable length parameters list
+SCM_TYPE_INT32 = 0x01 # 32-bit integer (or label offset)
+SCM_TYPE_GLOBAL_VAR = 0x02 # Global variable (16-bit offset)
+SCM_TYPE_LOCAL_VAR = 0x03 # Local variable (16-bit index)
+SCM_TYPE_INT8 = 0x04 # 8-bit integer
+SCM_TYPE_INT16 = 0x05 # 16-bit integer
+SCM_TYPE_FLOAT = 0x06 # Float (16-bit fixed point in GTA III, 32-bit in Vice City)
+
+# Games whose compiled SCM can be decoded, with the size of their float parameters
+SCM_GAMES = {
+    "gta3": {"name": "GTA III", "float_size": 2},
+    "vc": {"name": "GTA Vice City", "float_size": 4},
+}
+
+# Function to load the opcodes parameters table of a game from a Sanny Builder SCM.INI file ("XXXX=N,text" lines)
+def LoadOpcodeTable(ini_path):
+    # Dictionary to map each opcode to its parameters count (-1 for a variable length list) and its label parameters
+    opcode_table = {}
+
+    # Opens the opcodes file in read mode
+    with open(ini_path, "r", encoding="utf-8", errors="replace") as file:
+        # Iterates through the opcode definition lines
         for line in file:
-            # Checks if the line contains the 'wait' instruction
-            if "} 0001: wait" in line:
-                offsets = line.split("}")[0].strip("{").split() # Extracts the numbers between "{}"
-                
-                # Ensures that the line has exactly two integer numbers
-                if len(offsets) == 2 and all(num.isdigit() for num in offsets):
-                    missions_waits_count  += 1  # Increments the count of waits lines
-                    
-    # Returns the count of waits lines that has 2 numbers between brackets              
-    return missions_waits_count 
+            match = re.match(r"\s*([0-9A-Fa-f]{4})=(-?\d+),(.*)", line)
+            if match:
+                # Extracts the label parameters ("%Np%") of the opcode text
+                label_parameters = frozenset(int(number) - 1 for number in re.findall(r"%(\d+)p%", match.group(3)))
 
-# Function to get wait instructions from SCM file
-def GetWaitsLines(file_path):
-    # List to store the waits results1
+                # Adds the opcode to the table
+                opcode_table[int(match.group(1), 16)] = (int(match.group(2)), label_parameters)
+
+    # Returns the opcodes table
+    return opcode_table
+
+# Function to load the mission names of a compiled SCM from a text file (one name per line, in mission order)
+def LoadMissionNames(names_path):
+    # Returns the non empty lines of the file
+    with open(names_path, "r", encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+# Function to read the jump that starts each segment of a compiled SCM header and return its target offset
+def ReadSegmentJump(scm_buffer, offset):
+    # Checks for a "0002: goto" with a 32-bit integer parameter
+    if scm_buffer[offset:offset + 3] != b"\x02\x00\x01":
+        raise ValueError(f"Not a GTA III or Vice City compiled SCM file (no segment jump at offset {offset})")
+
+    # Returns the jump target
+    return struct.unpack_from("<i", scm_buffer, offset + 3)[0]
+
+# Function to read the header of a compiled SCM (main script size and mission offsets table)
+def ReadBinaryScmHeader(scm_buffer):
+    # Follows the jumps of the variables and models segments to the missions segment
+    models_segment = ReadSegmentJump(scm_buffer, 0)
+    missions_segment = ReadSegmentJump(scm_buffer, models_segment)
+    main_script = ReadSegmentJump(scm_buffer, missions_segment)
+
+    # Reads the missions segment (jump, alignment byte, main size, largest mission size, missions count)
+    main_size, largest_mission_size, missions_count = struct.unpack_from("<iiH", scm_buffer, missions_segment + 8)
+
+    # Reads the mission offsets table at the end of the segment (Vice City adds an exclusive missions count before it)
+    mission_offsets = list(struct.unpack_from(f"<{missions_count}i", scm_buffer, main_script - 4 * missions_count))
+
+    # Returns the header data
+    return {"main_script": main_script, "main_size": main_size, "largest_mission_size": largest_mission_size, "mission_offsets": mission_offsets}
+
+# Function to decode the instructions of a compiled SCM code block (global offset, opcode and label targets of each one)
+def DecodeBinaryScmInstructions(scm_buffer, start, end, opcode_table, float_size):
+    # List to store the decoded instructions
+    instructions = []
+
+    # Sizes of the parameters by data type (after the data type byte)
+    parameter_sizes = {SCM_TYPE_INT32: 4, SCM_TYPE_GLOBAL_VAR: 2, SCM_TYPE_LOCAL_VAR: 2, SCM_TYPE_INT8: 1, SCM_TYPE_INT16: 2, SCM_TYPE_FLOAT: float_size}
+
+    # Walks the opcode stream
+    position = start
+    while position < end:
+        instruction_offset = position # Global offset of the instruction
+        opcode = struct.unpack_from("<H", scm_buffer, position)[0] # Opcode (with the negation bit)
+        position += 2
+
+        # Gets the parameters of the opcode (without the negation bit)
+        if opcode & 0x7FFF not in opcode_table:
+            raise ValueError(f"Unknown opcode {opcode:04X} at offset {instruction_offset}")
+        parameters_count, label_parameters = opcode_table[opcode & 0x7FFF]
+
+        # List to store the label targets of the instruction
+        labels = []
+
+        # Iterates through the parameters (until the end byte for a variable length list)
+        parameter = 0
+        while parameters_count < 0 or parameter < parameters_count:
+            data_type = scm_buffer[position]
+
+            # Checks for the end of a variable length parameters list
+            if parameters_count < 0 and data_type == SCM_TYPE_END:
+                position += 1
+                break
+
+            # Skips the parameter (an unknown data type is the first byte of an 8 bytes string)
+            if data_type in parameter_sizes:
+                # Stores the label targets
+                if parameter in label_parameters and data_type == SCM_TYPE_INT32:
+                    labels.append(struct.unpack_from("<i", scm_buffer, position + 1)[0])
+                position += 1 + parameter_sizes[data_type]
+            else:
+                position += 8
+
+            parameter += 1
+
+        # Appends the decoded instruction
+        instructions.append((instruction_offset, opcode, labels))
+
+    # Returns the decoded instructions
+    return instructions
+
+# Function to scan a compiled GTA SCM file and yield the same records as the decompiled text scanner (for the missions)
+def ScanBinaryScmFile(scm_path, opcode_table, game="gta3", mission_names=None):
+    float_size = SCM_GAMES[game]["float_size"] # Size of the float parameters of the game
+
+    # Memory-maps the compiled SCM file
+    with open(scm_path, "rb") as file:
+        scm_buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        # Reads the mission offsets (each mission ends where the next one starts)
+        mission_offsets = ReadBinaryScmHeader(scm_buffer)["mission_offsets"]
+        mission_ends = mission_offsets[1:] + [len(scm_buffer)]
+
+        # Variable to store the line number of the record (decompiled text lines are emulated, so adjacency works the same)
+        line_number = 0
+
+        # Iterates through the missions
+        for mission_number, (mission_offset, mission_end) in enumerate(zip(mission_offsets, mission_ends)):
+            instructions = DecodeBinaryScmInstructions(scm_buffer, mission_offset, mission_end, opcode_table, float_size)
+
+            # Gets the local offsets of the labels of the mission (negative targets are local to the mission, positive ones are global)
+            label_offsets = {-target if target < 0 else target - mission_offset for _, _, labels in instructions for target in labels}
+            label_offsets = {offset for offset in label_offsets if 0 <= offset < mission_end - mission_offset}
+
+            # Gets the mission name (from the names list, else from its name_thread, else its number)
+            if mission_names and mission_number < len(mission_names):
+                mission_name = mission_names[mission_number]
+            else:
+                mission_name = f"Mission {mission_number}"
+                for instruction_offset, opcode, _ in instructions:
+                    if opcode == 0x03A4 and scm_buffer[instruction_offset + 2] not in (SCM_TYPE_INT32, SCM_TYPE_GLOBAL_VAR, SCM_TYPE_LOCAL_VAR):
+                        mission_name = bytes(scm_buffer[instruction_offset + 2:instruction_offset + 10]).split(b"\0")[0].decode("ascii", "replace")
+                        break
+
+            # Yields the mission block header and the mission name
+            yield (RECORD_MISSION, line_number, mission_offset, None, None, None)
+            yield (RECORD_NAME, line_number + 1, mission_offset, None, mission_name, None)
+            line_number += 2
+
+            # Iterates through the instructions of the mission
+            for instruction_offset, opcode, _ in instructions:
+                local_offset = instruction_offset - mission_offset
+
+                # Skips a blank line and the label line before each label, like the decompiled text
+                if local_offset in label_offsets:
+                    line_number += 2
+
+                # Classifies the instruction by its opcode
+                if opcode == 0x0001:
+                    kind = RECORD_WAIT
+                elif opcode == 0x0050:
+                    kind = RECORD_GOSUB
+                else:
+                    kind = RECORD_INSTRUCTION
+
+                # Yields the instruction record
+                yield (kind, line_number, instruction_offset, (instruction_offset, local_offset), opcode, None)
+                line_number += 1
+    finally:
+        scm_buffer.close()
+
+# Function to collect the waits count, the waits, the mission stacks and the instruction index from a compiled GTA SCM file
+def CollectBinaryScmData(scm_path, opcode_table, game="gta3", mission_names=None):
+    scm_data = CollectScmRecords(scm_path, ScanBinaryScmFile(scm_path, opcode_table, game, mission_names))
+
+    # Marks the instruction index as binary (its line positions are byte offsets of instructions, not of text lines)
+    scm_data[3].binary = True
+
+    # Returns the waits count, the waits, the mission stacks and the instruction index
+    return scm_data
+
+# Function to compare the data of two parses of the same script (for example a compiled SCM against its decompiled text) and list the differences
+def CompareScmData(reference_data, candidate_data):
+    # List to store the differences
+    differences = []
+
+    # Compares the waits counts
+    if reference_data[0] != candidate_data[0]:
+        differences.append(f"Waits count: {reference_data[0]} != {candidate_data[0]}")
+
+    # Compares the waits offsets (the mission names may differ between the sources)
+    reference_waits = {(wait_offsets, next_instr_offsets) for wait_offsets, next_instr_offsets, _ in reference_data[1]}
+    candidate_waits = {(wait_offsets, next_instr_offsets) for wait_offsets, next_instr_offsets, _ in candidate_data[1]}
+    for wait_offsets, next_instr_offsets in sorted(reference_waits - candidate_waits):
+        differences.append(f"Missing wait: {wait_offsets} -> {next_instr_offsets}")
+    for wait_offsets, next_instr_offsets in sorted(candidate_waits - reference_waits):
+        differences.append(f"Extra wait: {wait_offsets} -> {next_instr_offsets}")
+
+    # Compares the mission stacks in mission order
+    reference_stacks = list(reference_data[2].values())
+    candidate_stacks = list(candidate_data[2].values())
+    if reference_stacks != candidate_stacks:
+        differences.append(f"Mission stacks: {reference_stacks} != {candidate_stacks}")
+
+    # Compares the instruction offsets and opcodes
+    reference_index, candidate_index = reference_data[3], candidate_data[3]
+    reference_instructions = set(zip(reference_index.global_offsets, reference_index.local_offsets, reference_index.opcodes))
+    candidate_instructions = set(zip(candidate_index.global_offsets, candidate_index.local_offsets, candidate_index.opcodes))
+    if reference_instructions != candidate_instructions:
+        differences.append(f"Instructions: {len(reference_instructions - candidate_instructions)} missing, {len(candidate_instructions - reference_instructions)} extra")
+
+    # Returns the differences
+    return differences
+
+# Function to find the byte offsets of the mission blocks headers of a GTA SCM file
+def FindMissionBoundaries(file_path):
+    # List to store the byte offsets of the mission blocks headers
+    boundaries = []
+
+    # Memory-maps the SCM file and searches the headers at the start of the lines
+    with open(file_path, "rb") as file:
+        # Checks if the file is empty (an empty file can't be memory-mapped)
+        if os.fstat(file.fileno()).st_size == 0:
+            return boundaries
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as scm_buffer:
+            # Checks if the file starts with a mission header
+            if scm_buffer[:22] == b"//-------------Mission":
+                boundaries.append(0)
+
+            # Finds the next mission headers
+            position = scm_buffer.find(b"\n//-------------Mission")
+            while position != -1:
+                boundaries.append(position + 1)
+                position = scm_buffer.find(b"\n//-------------Mission", position + 1)
+
+    # Returns the byte offsets of the mission blocks headers
+    return boundaries
+
+# Function to get the byte ranges of the blocks of a GTA SCM file (the main part of the script, then each mission block)
+def GetMissionBlockRanges(file_path):
+    # Gets the byte ranges between the mission blocks headers
+    starts = [0] + [boundary for boundary in FindMissionBoundaries(file_path) if boundary > 0]
+
+    # Returns the byte ranges
+    return list(zip(starts, starts[1:] + [os.path.getsize(file_path)]))
+
+# Function to split a GTA SCM file into byte ranges of whole mission blocks, of similar sizes
+def GetMissionShards(file_path, shards_count):
+    # Groups consecutive mission blocks until each group reaches the target size
+    target_size = os.path.getsize(file_path) / max(1, shards_count)
+    shards = []
+    for start, end in GetMissionBlockRanges(file_path):
+        if shards and shards[-1][1] - shards[-1][0] < target_size:
+            shards[-1] = (shards[-1][0], end) # Extends the current group
+        else:
+            shards.append((start, end)) # Starts a new group
+
+    # Returns the byte ranges of the shards
+    return shards
+
+# Function to merge the data collected from the shards of a GTA SCM file (in file order) into the data of the whole file
+def MergeScmData(file_path, shards_data):
+    # Variables to store the merged data
+    missions_waits_count = 0
     waitsresults = []
-    
-    # Variable to store the current mission name
-    current_mission = "Unknown Mission"
-    
-    # Opens the SCM file in read mode
-    with open(file_path, "r", encoding="utf-8") as file:
-        lines = file.readlines() # Reads all the lines from the file
-    
-    # Iterates through the lines
-    for i, line in enumerate(lines):
-        # Checks if the line indicates a mission name
-        if line.strip().startswith("// Originally:"):
-            current_mission = line.split(":", 1)[1].strip() # Extracts the mission name
-        
-        # Checks if the line contains the 'wait' instruction
-        if "} 0001: wait" in line:
-            wait_line_offsets = line.split("}")[0].strip("{").split()  # Extracts offset numbers from the wait instruction line
-            
-            # Ensures the wait line has exactly two numbers
-            if len(wait_line_offsets) == 2 and i + 1 < len(lines):
-                next_instruction_of_wait_line = lines[i + 1].strip() # Extracts the next instruction line
-                
-                # Validates next instruction contains '}' and if isn't empty
-                if "}" in next_instruction_of_wait_line and next_instruction_of_wait_line:
-                    next_instruction_of_wait_line_offsets = next_instruction_of_wait_line.split("}")[0].strip("{").split() # Extracts numbers from the next instruction line
-                    
-                    # Ensures the next instruction also has two numbers
-                    if len(next_instruction_of_wait_line_offsets) == 2:
-                        waitsresults.append((wait_line_offsets, next_instruction_of_wait_line_offsets, current_mission)) # Appends the wait line and the next instruction line with the current mission name
-    
-    # Sorts the results by global offset
-    waitsresults.sort(key=lambda x: int(x[0][0]))
-    
-    # Returns the wait instructions with their next instructions and mission names
-    return waitsresults
+    mission_stacks = {}
+    instruction_index = ScmInstructionIndex(file_path)
 
-""" Main Program """
+    # Iterates through the data of the shards
+    for shard_waits_count, shard_waits, shard_stacks, shard_index in shards_data:
+        missions_waits_count += shard_waits_count
+        waitsresults.extend(shard_waits)
+        mission_stacks.update(shard_stacks)
+
+        # Maps the mission ids of the shard to the mission ids of the merged index
+        mission_ids = [instruction_index.InternMission(mission_name) for mission_name in shard_index.mission_names]
+
+        # Appends the instruction columns of the shard
+        instruction_index.global_offsets.extend(shard_index.global_offsets)
+        instruction_index.local_offsets.extend(shard_index.local_offsets)
+        instruction_index.opcodes.extend(shard_index.opcodes)
+        instruction_index.mission_ids.extend(mission_ids[mission_id] for mission_id in shard_index.mission_ids)
+        instruction_index.line_positions.extend(shard_index.line_positions)
 
-print(colored("Starting the script...", "cyan"))
+    # Sorts the waits results by global offset
+    waitsresults.sort(key=lambda x: x[0][0])
 
-print("")
+    # Returns the waits count, the waits, the mission stacks and the instruction index
+    return missions_waits_count, waitsresults, mission_stacks, instruction_index
 
-print(colored("Processing GTA III (Original) SCM file...", "yellow"))
+# Function to parse a GTA SCM file, split by mission blocks across worker processes when more than one worker is requested
+def ParseScmFile(file_path, parse_workers=None):
+    # Parses the SCM file in a single scan if there is only one worker
+    if not parse_workers or parse_workers <= 1:
+        return CollectScmData(file_path)
 
-print("")
+    # Splits the SCM file in a few shards per worker (so the workers stay busy when the missions sizes differ)
+    shards = GetMissionShards(file_path, parse_workers * 4)
+    if len(shards) < 2:
+        return CollectScmData(file_path)
 
-print(colored("Getting all the waits offsets and the next instruction of the wait offsets from the GTA III (Original) SCM file...", "yellow"))
+    # Parses the shards on the worker processes (with the console verbosity of this process, the spawned workers don't inherit it)
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(parse_workers, len(shards)), initializer=SetVerbosity, initargs=(console_verbosity,)) as executor:
+        shards_data = list(executor.map(CollectScmData, [file_path] * len(shards), *zip(*shards)))
 
-print("")
+    # Returns the data of the shards merged in file (global offset) order
+    return MergeScmData(file_path, shards_data)
 
-# Calls the function to count lines with '} 0001: wait' on the from the SCM file
-missions_waits_count = MissionsWaitsCounter(input_file_path)
+# Incremental analysis state file format (bump the version whenever the stored data changes)
+INCREMENTAL_FORMAT_VERSION = 3
 
-# Calls the function to get the waits offsets (globals and locals) and the next instruction of the wait offsets (globals and locals) from the SCM file
-waitsoffsets = GetWaitsLines(input_file_path)
+# Function to split a GTA SCM file into its blocks (the main part and each mission block) with a key from their content hash
+def GetScmBlocks(file_path):
+    # List to store the (start, end, key) of the blocks
+    blocks = []
 
-print("")
+    # Dictionary to count the blocks with the same content (their keys get an occurrence number)
+    occurrences = {}
 
-print(colored("Getting all the mission stacks from the GTA III (Original) SCM file...", "yellow"))
+    # Hashes the content of each block
+    with open(file_path, "rb") as file:
+        for start, end in GetMissionBlockRanges(file_path):
+            file.seek(start)
+            block_hash = hashlib.blake2b(file.read(end - start), digest_size=16).hexdigest()
+            occurrences[block_hash] = occurrences.get(block_hash, 0) + 1
+            blocks.append((start, end, f"{block_hash}_{occurrences[block_hash]}"))
 
-print("")
+    # Returns the blocks
+    return blocks
 
-# Calls the function to get all the mission stacks from the GTA SCM file 
-mission_stacks = GetMissionStacks(input_file_path)
+# Function to join waits with the instructions of an index, returning for each wait its (target block key, global offset, local offset, mission name) matches
+def JoinWaitsWithInstructions(waitsresults, instruction_index, instruction_block_starts, instruction_block_keys):
+    # List to store the matches of each wait
+    waits_matches = []
 
-print("")
+    # Sorts the instructions by local offset once (every lookup is then a binary search)
+    instruction_index.SortByLocalOffset()
 
-print(colored("Getting all the Trivial Dupes from the GTA III (Original) SCM file...", "yellow"))
+    # Iterates through the waits to join them with the instructions
+    for wait_offsets, next_instr_offsets, mission_name in waitsresults:
+        matches = []
 
-print("")
+        # Iterates through all the instructions with the same local offset (skipping the mission of the wait)
+        for matching_index in instruction_index.FindLocalOffset(next_instr_offsets[1]):
+            matching_mission_name = instruction_index.GetMissionName(matching_index)
+            if matching_mission_name != mission_name:
+                block_key = instruction_block_keys[bisect_right(instruction_block_starts, matching_index) - 1] # Block of the matching instruction
+                matches.append((block_key, instruction_index.global_offsets[matching_index], instruction_index.local_offsets[matching_index], matching_mission_name))
 
-# Calls the function to get all the lines from the GTA SCM file
-all_lines_from_scm = GetAllLines(input_file_path)
+        waits_matches.append(matches)
 
-# Calls the function to find and group the matching local offsets from the GTA SCM file
-matching_offsets = FindMatchingLocalOffsets(waitsoffsets, all_lines_from_scm)
+    # Returns the matches of each wait
+    return waits_matches
 
-# Prints the results (calling the function)
-PrintResults(waitsoffsets, missions_waits_count, matching_offsets, mission_stacks)
+# Function to merge the data of blocks and get, for each instruction of the merged index, where each block starts
+def MergeScmBlocks(file_path, blocks_data, block_keys):
+    # Variables to store the first instruction of each block in the merged index
+    instruction_block_starts = []
+    instructions_count = 0
+    for block_data in blocks_data:
+        instruction_block_starts.append(instructions_count)
+        instructions_count += len(block_data[3])
 
-# Calls the function to save the mission waits data to a file
-SaveMissionWaitsDataToFile(output_file_missions_waits, waitsoffsets, missions_waits_count)
+    # Returns the merged data with the instruction block starts and keys
+    return MergeScmData(file_path, blocks_data), instruction_block_starts, list(block_keys)
 
-# Calls the function to save the mission stacks data to a file
-SaveMissionStacksToFile(output_file_missions_compatibilities, mission_stacks)
+# Function to analyse a GTA SCM file reusing the results of the unchanged blocks of the last run, and update its three reports
+def AnalyseScmFileIncrementally(file_path, output_dir, cache_dir, compress=False):
+    # Variable to store the start time of the analysis
+    start_time = time.perf_counter()
 
-# Calls the function to save the trivial dupes data to a file
-SaveTrivialDupesDataToFile(output_file_trivial_dupes, matching_offsets, mission_stacks)
+    # Loads the state of the last run of the SCM file (an unreadable or old state is rebuilt)
+    os.makedirs(cache_dir, exist_ok=True)
+    state_path = os.path.join(cache_dir, "incremental_" + hashlib.blake2b(os.path.abspath(file_path).encode("utf-8"), digest_size=16).hexdigest() + ".pickle")
+    try:
+        with open(state_path, "rb") as file:
+            state = pickle.load(file)
+        if state.get("version") != INCREMENTAL_FORMAT_VERSION or state.get("output_dir") != os.path.abspath(output_dir):
+            raise ValueError("Old incremental state")
+    except (OSError, ValueError, EOFError, AttributeError, ImportError, pickle.UnpicklingError):
+        state = {"blocks": {}, "sections": {}}
+    old_blocks = state["blocks"]
 
-# Prints where the output file of the mission waits was saved
-print(colored(f"Missions waits saved to: {output_file_missions_waits}", "green"))
+    # Gets the blocks of the SCM file and parses only the new or changed ones
+    blocks = GetScmBlocks(file_path)
+    block_keys = [key for _, _, key in blocks]
+    blocks_state = {}
+    for start, end, key in blocks:
+        block_state = old_blocks.get(key)
 
-print("")
+        # Reuses the block data (moving its line positions if the block moved in the file)
+        if block_state is not None:
+            block_index = block_state["data"][3]
+            if block_state["start"] != start:
+                shift = start - block_state["start"]
+                block_index.line_positions = array("q", (position + shift for position in block_index.line_positions))
+            blocks_state[key] = dict(block_state, start=start)
+        else:
+            blocks_state[key] = {"start": start, "data": CollectScmData(file_path, start, end), "matches": None}
+
+    # Variables to store the changed (new) blocks and the blocks of the last run that are gone
+    changed_keys = {key for key in block_keys if blocks_state[key]["matches"] is None}
+    removed_keys = set(old_blocks) - set(block_keys)
+    block_order = {key: order for order, key in enumerate(block_keys)} # Position of each block in the file
+
+    # Merges the data of all the blocks
+    scm_data, instruction_block_starts, instruction_block_keys = MergeScmBlocks(file_path, [blocks_state[key]["data"] for key in block_keys], block_keys)
+    missions_waits_count, waitsoffsets, mission_stacks, instruction_index = scm_data
+
+    # Merges the data of the changed blocks only (the waits of the unchanged blocks are joined with it)
+    changed_block_keys = [key for key in block_keys if key in changed_keys]
+    changed_data, changed_block_starts, _ = MergeScmBlocks(file_path, [blocks_state[key]["data"] for key in changed_block_keys], changed_block_keys)
 
-# Prints where the output file of the missions compatibilities was saved
-print(colored(f"Missions compatibilities saved to: {output_file_missions_compatibilities}", "green"))
+    # Set to store the local offsets of the trivial dupes sections to format again
+    dirty_local_offsets = set()
+
+    # Adds the sections of the waits of the blocks that are gone
+    for key in removed_keys:
+        dirty_local_offsets.update(next_instr_offsets[1] for _, next_instr_offsets, _ in old_blocks[key]["data"][1])
+
+    # Updates the matches of the waits of each block
+    for key in block_keys:
+        block_state = blocks_state[key]
+        block_waits = block_state["data"][1]
+
+        # Joins the waits of a changed block with all the instructions
+        if key in changed_keys:
+            block_state["matches"] = JoinWaitsWithInstructions(block_waits, instruction_index, instruction_block_starts, instruction_block_keys)
+            dirty_local_offsets.update(next_instr_offsets[1] for _, next_instr_offsets, _ in block_waits)
+            continue
 
-print("")
+        # Joins the waits of an unchanged block only with the instructions of the changed blocks
+        new_matches = JoinWaitsWithInstructions(block_waits, changed_data[3], changed_block_starts, changed_block_keys) if changed_keys else [[] for _ in block_waits]
+        for wait_number, (wait, old_wait_matches) in enumerate(zip(block_waits, block_state["matches"])):
+            # Keeps the matches of the unchanged blocks
+            wait_matches = [match for match in old_wait_matches if match[0] not in removed_keys and match[0] not in changed_keys]
 
-# Prints where the output file of the trivial dupes was saved
-print(colored(f"Trivial dupes saved to: {output_file_trivial_dupes}", "green"))
+            # Checks if the wait matches changed (or match a changed block, whose stack may have changed)
+            if len(wait_matches) != len(old_wait_matches) or new_matches[wait_number]:
+                wait_matches.extend(new_matches[wait_number])
+                wait_matches.sort(key=lambda match: (block_order[match[0]], match[1])) # Keeps the file order of the full join
+                block_state["matches"][wait_number] = wait_matches
+                dirty_local_offsets.add(wait[1][1])
 
-print("")
+    # Groups the matches of all the waits (in global offset order) by local offset, like FindMatchingLocalOffsets
+    waits_with_matches = sorted(((wait, wait_matches) for key in block_keys for wait, wait_matches in zip(blocks_state[key]["data"][1], blocks_state[key]["matches"])), key=lambda item: item[0][0][0])
+    matching_offsets = {}
+    for wait, wait_matches in waits_with_matches:
+        for _, matching_global_offset, matching_local_offset, matching_mission_name in wait_matches:
+            matching_offsets.setdefault(wait[1][1], []).append((wait, ((matching_global_offset, matching_local_offset), None, matching_mission_name)))
 
-# Prints that the execution was completed
-print(colored("Execution completed!", "green"))
+    # Formats again only the changed sections of the mission waits data (each block rows depend on the mission and wait number before them)
+    waits_rows = []
+    current_mission, wait_number = None, 0
+    for key in block_keys:
+        block_state = blocks_state[key]
+        block_waits = block_state["data"][1]
+        if block_state.get("waits_context") != (current_mission, wait_number):
+            block_state["waits_context"] = (current_mission, wait_number)
+            block_state["waits_rows"] = FormatMissionWaitsRows(block_waits, current_mission, wait_number)
+        waits_rows.append(block_state["waits_rows"])
 
-print("")
+        # Updates the mission and wait number after the block
+        for _, _, mission_name in block_waits:
+            wait_number = wait_number + 1 if mission_name == current_mission else 1
+            current_mission = mission_name
 
-input("Press any key to continue...")
\ No newline at end of file
+    # Formats again only the changed sections of the mission stacks data (the whole data if a mission name is repeated in many blocks)
+    if len(mission_stacks) == sum(len(blocks_state[key]["data"][2]) for key in block_keys):
+        stacks_rows = []
+        for key in block_keys:
+            if "stacks_rows" not in blocks_state[key]:
+                blocks_state[key]["stacks_rows"] = FormatMissionStacksRows(blocks_state[key]["data"][2])
+            stacks_rows.append(blocks_state[key]["stacks_rows"])
+        stacks_rows = "".join(stacks_rows)
+    else:
+        stacks_rows = FormatMissionStacksRows(mission_stacks)
+
+    # Formats again only the changed sections of the trivial dupes data
+    sections = state["sections"]
+    for local_offset in dirty_local_offsets:
+        sections.pop(local_offset, None)
+    for local_offset, cases in matching_offsets.items():
+        if local_offset not in sections:
+            sections[local_offset] = FormatTrivialDupesSection(local_offset, cases, mission_stacks)
+    state["sections"] = {local_offset: sections[local_offset] for local_offset in matching_offsets}
+
+    # Saves the reports (only if a block changed or the reports are missing)
+    output_path_missions_waits = os.path.join(output_dir, "Mission_Waits", "mission_waits_output.txt")
+    output_path_missions_compatibilities = os.path.join(output_dir, "Missions_Compatibilities", "missions_compatibilities_output.txt")
+    output_path_trivial_dupes = os.path.join(output_dir, "Trivial_Dupes", "trivial_dupes_output.txt")
+    reports = {
+        output_path_missions_waits: [FormatMissionWaitsHeaders()] + waits_rows,
+        output_path_missions_compatibilities: [FormatMissionStacksHeaders(), stacks_rows],
+        output_path_trivial_dupes: ["Matching trivial dupes found:\n\n"] + list(state["sections"].values()) if matching_offsets else ["No matching local offsets found.\n"],
+    }
+    for output_path, report_parts in reports.items():
+        if changed_keys or removed_keys or not os.path.exists(GetReportPath(output_path, compress)):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with OpenReportFile(output_path, compress) as file:
+                WriteInChunks(file, report_parts)
+
+    # Saves the state for the next run
+    state.update(version=INCREMENTAL_FORMAT_VERSION, output_dir=os.path.abspath(output_dir), blocks=blocks_state)
+    WriteFileAtomically(state_path, pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+
+    # Returns the data and the summary of the SCM file
+    return scm_data, matching_offsets, {
+        "file": file_path, # SCM file path
+        "output_dir": output_dir, # Output directory of the reports
+        "waits_count": missions_waits_count, # Count of waits lines
+        "waits": len(waitsoffsets), # Waits with a next instruction
+        "missions": len(mission_stacks), # Missions with a stack
+        "trivial_dupes": sum(len(cases) for cases in matching_offsets.values()), # Trivial dupes cases
+        "seconds": time.perf_counter() - start_time, # Analysis time
+        "blocks": len(block_keys), # Blocks of the SCM file
+        "reparsed_blocks": len(changed_keys), # Blocks parsed again
+    }
+
+# Function to compute the content hash of a GTA SCM file
+def HashScmFile(file_path):
+    # Hashes the file in 1 MB chunks
+    file_hash = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            file_hash.update(chunk)
+
+    # Returns the hexadecimal hash
+    return file_hash.hexdigest()
+
+# Function to get the content hash of a GTA SCM file, hashing it again only when its size or mtime changed
+def GetScmFileKey(file_path, cache_dir):
+    index_path = os.path.join(cache_dir, CACHE_INDEX_FILE_NAME) # Cache index file path
+    file_stat = os.stat(file_path) # Size and mtime of the SCM file
+    file_path = os.path.abspath(file_path)
+
+    # Loads the cache index (an unreadable index is rebuilt)
+    try:
+        with open(index_path, "r", encoding="utf-8") as file:
+            cache_index = json.load(file)
+    except (OSError, ValueError):
+        cache_index = {}
+
+    # Checks if the file is unchanged since it was last hashed
+    entry = cache_index.get(file_path)
+    if entry and entry["size"] == file_stat.st_size and entry["mtime_ns"] == file_stat.st_mtime_ns:
+        return entry["hash"]
+
+    # Hashes the file and stores its key in the cache index
+    content_hash = HashScmFile(file_path)
+    cache_index[file_path] = {"size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns, "hash": content_hash}
+    WriteFileAtomically(index_path, json.dumps(cache_index, indent=4).encode("utf-8"))
+
+    # Returns the content hash
+    return content_hash
+
+# Function to write a file through a temporary file, so readers never see a partial file
+def WriteFileAtomically(output_path, data):
+    temporary_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(data)
+    os.replace(temporary_path, output_path)
+
+# Function to save the parsed SCM data to a cache file
+def SaveScmDataToCache(cache_path, missions_waits_count, waitsresults, mission_stacks, instruction_index):
+    # Sorts the instructions by local offset, so the sorted columns are cached too
+    instruction_index.SortByLocalOffset()
+    mission_ids = instruction_index.mission_ids_by_name
+
+    # Flattens the waits into (wait global, wait local, next global, next local, mission id) rows
+    waits = array("i")
+    for wait_offsets, next_instr_offsets, mission_name in waitsresults:
+        waits.extend((wait_offsets[0], wait_offsets[1], next_instr_offsets[0], next_instr_offsets[1], mission_ids[mission_name]))
+
+    # Flattens the stacks into (mission id, stack) rows
+    stacks = array("i")
+    for mission_name, stack in mission_stacks.items():
+        stacks.extend((mission_ids[mission_name], stack))
+
+    # Joins the mission names table
+    mission_names = "\0".join(instruction_index.mission_names).encode("utf-8")
+
+    # Builds the cache file (every section is padded to 8 bytes, so all the columns stay aligned)
+    sections = [
+        CACHE_HEADER.pack(CACHE_MAGIC, CACHE_FORMAT_VERSION, missions_waits_count, len(instruction_index), len(waitsresults), len(mission_stacks), len(mission_names)),
+        array("i", instruction_index.global_offsets).tobytes(),
+        array("i", instruction_index.local_offsets).tobytes(),
+        array("H", instruction_index.opcodes).tobytes(),
+        array("H", instruction_index.mission_ids).tobytes(),
+        array("q", instruction_index.line_positions).tobytes(),
+        array("i", instruction_index.local_offset_order).tobytes(),
+        array("i", instruction_index.sorted_local_offsets).tobytes(),
+        waits.tobytes(),
+        stacks.tobytes(),
+        mission_names,
+    ]
+    data = b"".join(section + b"\0" * (-len(section) % 8) for section in sections)
+
+    # Writes the cache file
+    WriteFileAtomically(cache_path, data)
+
+# Function to load the parsed SCM data from a cache file by memory-mapping it
+def LoadScmDataFromCache(cache_path, file_path):
+    # Memory-maps the cache file (the columns are read straight from the mapping)
+    with open(cache_path, "rb") as file:
+        cache_buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # Checks the cache file header
+    magic, version, missions_waits_count, instructions_count, waits_count, stacks_count, names_length = CACHE_HEADER.unpack_from(cache_buffer)
+    if magic != CACHE_MAGIC or version != CACHE_FORMAT_VERSION:
+        cache_buffer.close()
+        return None
+
+    # Variables to walk through the cache file sections
+    view = memoryview(cache_buffer)
+    position = CACHE_HEADER.size + (-CACHE_HEADER.size % 8)
+
+    # Function to get the next section of the cache file as a typed column
+    def NextSection(type_code, item_size, count):
+        nonlocal position
+        size = item_size * count
+        section = view[position:position + size]
+        position += size + (-size % 8)
+        return section.cast(type_code) if type_code else section
+
+    # Rebuilds the instruction index over the memory-mapped columns
+    instruction_index = ScmInstructionIndex(file_path)
+    instruction_index.global_offsets = NextSection("i", 4, instructions_count)
+    instruction_index.local_offsets = NextSection("i", 4, instructions_count)
+    instruction_index.opcodes = NextSection("H", 2, instructions_count)
+    instruction_index.mission_ids = NextSection("H", 2, instructions_count)
+    instruction_index.line_positions = NextSection("q", 8, instructions_count)
+    instruction_index.local_offset_order = NextSection("i", 4, instructions_count)
+    instruction_index.sorted_local_offsets = NextSection("i", 4, instructions_count)
+    instruction_index.cache_buffer = cache_buffer # Keeps the mapping alive as long as the index
+
+    # Rebuilds the waits and the mission stacks
+    waits = NextSection("i", 4, waits_count * 5)
+    stacks = NextSection("i", 4, stacks_count * 2)
+    mission_names = bytes(NextSection(None, 1, names_length)).decode("utf-8").split("\0")
+    for mission_name in mission_names:
+        instruction_index.InternMission(mission_name)
+    waitsresults = [((waits[i], waits[i + 1]), (waits[i + 2], waits[i + 3]), mission_names[waits[i + 4]]) for i in range(0, len(waits), 5)]
+    mission_stacks = {mission_names[stacks[i]]: stacks[i + 1] for i in range(0, len(stacks), 2)}
+
+    # Returns the waits count, the waits, the mission stacks and the instruction index
+    return missions_waits_count, waitsresults, mission_stacks, instruction_index
+
+# Function to evict the least recently used cache files until the cache fits its size cap
+def EvictScmCache(cache_dir, max_cache_size):
+    # Lists the cache files with their last use time and size
+    cache_files = []
+    for file_name in os.listdir(cache_dir):
+        if file_name.endswith(CACHE_FILE_EXTENSION):
+            file_stat = os.stat(os.path.join(cache_dir, file_name))
+            cache_files.append((file_stat.st_mtime, file_stat.st_size, file_name))
+
+    # Removes the oldest cache files first
+    total_size = sum(size for _, size, _ in cache_files)
+    for _, size, file_name in sorted(cache_files):
+        if total_size <= max_cache_size:
+            break
+        try:
+            os.remove(os.path.join(cache_dir, file_name))
+            total_size -= size
+        except OSError:
+            pass # The cache file is in use (it's removed on a later run)
+
+# Function to get the waits count, the waits, the mission stacks and the instruction index of a GTA SCM file, from the parse cache when possible
+def LoadScmData(file_path, cache_dir=None, max_cache_size=CACHE_MAX_SIZE, parse_workers=None):
+    # Parses the SCM file directly if the cache is disabled
+    if cache_dir is None:
+        return ParseScmFile(file_path, parse_workers)
+
+    # Gets the cache file path from the SCM file content hash
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path = os.path.join(cache_dir, GetScmFileKey(file_path, cache_dir) + CACHE_FILE_EXTENSION)
+
+    # Loads the cache file if it exists and has the current format version
+    if os.path.exists(cache_path):
+        scm_data = LoadScmDataFromCache(cache_path, file_path)
+        if scm_data is not None:
+            os.utime(cache_path) # Marks the cache file as recently used
+            return scm_data
+
+    # Parses the SCM file and stores the results in the cache
+    scm_data = ParseScmFile(file_path, parse_workers)
+    SaveScmDataToCache(cache_path, *scm_data)
+    EvictScmCache(cache_dir, max_cache_size)
+
+    # Returns the parsed SCM data
+    return scm_data
+
+# Function to get all the mission stacks from the GTA SCM file
+def GetMissionStacks(file_path):
+    # Returns the mission stacks dictionary
+    return LoadScmData(file_path, scm_cache_dir)[2]
+
+# Function to get all the lines from a GTA SCM file
+def GetAllLines(file_path):
+    # Returns the instruction index with the global and local offsets, opcodes and missions of all the lines
+    return LoadScmData(file_path, scm_cache_dir)[3]
+
+# Function to save mission waits data to a file (gzip compressed when requested), returning the written file path
+def SaveMissionWaitsDataToFile(output_path, results, missions_waits_count, compress=False):
+    # Opens the output file in write mode
+    with OpenReportFile(output_path, compress) as file:
+        # Writes the headers and the data rows in one block
+        file.write(FormatMissionWaitsHeaders() + FormatMissionWaitsRows(results))
+
+    # Returns the written file path
+    return GetReportPath(output_path, compress)
+
+# Function to format the headers of the mission waits data
+def FormatMissionWaitsHeaders():
+    # Formats the headers with wider spacing
+    headers = "{:<15}{:<40}{:<40}{:<40}{:<40}{:<40}".format(
+        "Wait Number", # Wait Number Header
+        "Global Offset of the Wait Instruction", # Global Offset of the Wait Instruction Header
+        "Local Offset of the Wait Instruction", # Local Offset of the Wait Instruction Header
+        "Global Offset of the Next Instruction", # Global Offset of the Next Instruction Header
+        "Local Offset of the Next Instruction", # Local Offset of the Next Instruction Header
+        "Mission Name" # Mission Name Header
+    )
+
+    # Returns the headers with a separator line below them
+    return headers + "\n" + "=" * 215 + "\n"
+
+# Function to format the rows of the mission waits data (the wait number resets for each mission)
+def FormatMissionWaitsRows(results, current_mission=None, wait_number=0):
+    # List to store the rows
+    rows = []
+
+    # Iterates through the results to format the data rows
+    for wait_offsets, next_instruction_offsets, mission_name in results:
+        # Checks if the mission has changed
+        if mission_name != current_mission:
+            # Resets the wait number counter
+            wait_number = 0
+            
+            # Updates the current mission
+            current_mission = mission_name
+        
+        # Increments the wait number for the current mission
+        wait_number += 1
+        
+        # Formats the row
+        rows.append("{:<15}{:<40}{:<40}{:<40}{:<40}{:<40}\n".format(
+            wait_number, # Wait Number (resets for each mission
+            wait_offsets[0], # Global Offset of the Wait Instruction
+            wait_offsets[1], # Local Offset of the Wait Instruction
+            next_instruction_offsets[0], # Global Offset of the Next 
+            next_instruction_offsets[1], # Local Offset of the Next 
+            mission_name # Mission Name
+        ))
+
+    # Returns the rows
+    return "".join(rows)
+
+# Function to save trivial dupes data to a file (gzip compressed when requested), returning the written file path
+def SaveTrivialDupesDataToFile(output_path, matching_offsets, mission_stacks, compress=False):
+    # Opens the output file in write mode
+    with OpenReportFile(output_path, compress) as file:
+        # Writes matching offsets section
+        if matching_offsets:
+            # Writes the sections of the matching offsets in large blocks
+            WriteInChunks(file, FormatTrivialDupesSections(matching_offsets, mission_stacks))
+        else:
+            # Writes that no matching local offsets were found
+            file.write("No matching local offsets found.\n")
+
+    # Returns the written file path
+    return GetReportPath(output_path, compress)
+
+# Function to format the trivial dupes data section by section
+def FormatTrivialDupesSections(matching_offsets, mission_stacks):
+    yield "Matching trivial dupes found:\n\n"
+
+    # Iterates through the matching offsets and formats them
+    for local_offset, cases in matching_offsets.items():
+        yield FormatTrivialDupesSection(local_offset, cases, mission_stacks)
+
+# Function to format the section of the trivial dupes data of a local offset
+def FormatTrivialDupesSection(local_offset, cases, mission_stacks):
+    # List to store the section lines
+    lines = [f"Local Offset: {local_offset}\n"]
+
+    # Iterates through the cases and formats them
+    for idx, case in enumerate(cases, start=1):
+        # Extracts the cases
+        ((wait_offsets1, next_instr1, mission1), (other_offsets, _, mission2)) = case
+        lines.append(f"  Case {idx}:\n") # Formats the case number
+        lines.append(f"    From Wait (Mission: {mission1}, Stack: {mission_stacks.get(mission1)}):\n") # Formats the first mission with the stack
+        lines.append(f"      Global Offset: {wait_offsets1[0]}, Local Offset: {wait_offsets1[1]}\n") # Formats the global and local offsets of the wait instruction
+        lines.append(f"      Next Instruction: Global Offset: {next_instr1[0]}, Local Offset: {next_instr1[1]}\n") # Formats the global and local offsets of the next instruction
+        lines.append(f"    Matches With (Mission: {mission2}, Stack: {mission_stacks.get(mission2)}):\n") # Formats the second mission with the stack
+        lines.append(f"      Global Offset: {other_offsets[0]}, Local Offset: {other_offsets[1]}\n\n") # Formats the global and local offsets of the matching case
+
+    # Returns the section
+    return "".join(lines)
+
+# Function to find matching local offsets (every instruction of every other mission at the local offset of the wait next instruction)
+def FindMatchingLocalOffsets(results, instruction_index, mission_stacks=None, compatible_stacks_only=False):
+    # Checks that the stack filter has the mission stacks to compare
+    if compatible_stacks_only and mission_stacks is None:
+        raise ValueError("compatible_stacks_only needs the mission stacks")
+
+    # Dictionary to store the matching local offsets
+    offsets_matches = {}
+
+    # Sorts the instructions by local offset once (every lookup is then a binary search)
+    instruction_index.SortByLocalOffset()
+
+    # Iterates through the waits to join them with the instructions
+    for wait_offsets, next_instr_offsets, mission_name in results:
+        local_offset1 = next_instr_offsets[1]
+        wait_mission_id = instruction_index.mission_ids_by_name.get(mission_name) # Mission id of the wait
+        wait_stack = mission_stacks.get(mission_name) if mission_stacks is not None else None # Mission stack of the wait
+
+        # Iterates through all the instructions with the same local offset
+        for matching_index in instruction_index.FindLocalOffset(local_offset1):
+            matching_mission_id = instruction_index.mission_ids[matching_index] # Mission id of the matching line
+
+            # Skips the instructions of the mission of the wait
+            if matching_mission_id == wait_mission_id:
+                continue
+
+            # Extracts the correct offsets from the instruction index columns
+            matching_global_offset = instruction_index.global_offsets[matching_index]  # Global offset of the matching line
+            matching_local_offset = instruction_index.local_offsets[matching_index]  # Local offset of the matching line
+            matching_mission_name = instruction_index.mission_names[matching_mission_id]  # Mission name of the matching line
+
+            # Skips the missions whose stack isn't compatible with the stack of the wait mission (if requested)
+            if compatible_stacks_only and mission_stacks.get(matching_mission_name) != wait_stack:
+                continue
+
+            # Creates the matching offsets tuple with only the offset values
+            matching_offsets = (matching_global_offset, matching_local_offset)
+            offsets_matches.setdefault(local_offset1, []).append((
+                (wait_offsets, next_instr_offsets, mission_name), # Current wait offsets
+                (matching_offsets, None, matching_mission_name)   # Matching offsets
+            ))
+
+    # Returns the dictionary with the matching local offsets
+    return offsets_matches
+
+# Function to print the results of the waits offsets and the next instruction of the wait offsets (written to the console in large blocks), returning the written characters count
+def PrintResults(results, count, matching_offsets, mission_stacks, verbosity=None):
+    # Gets the verbosity level (the console one by default)
+    verbosity = console_verbosity if verbosity is None else verbosity
+
+    # Prints nothing in silent mode
+    if verbosity <= VERBOSITY_SILENT:
+        return 0
+
+    # Writes the formatted results and flushes them
+    written = WriteInChunks(sys.stdout, FormatResults(results, count, matching_offsets, mission_stacks, verbosity >= VERBOSITY_FULL))
+    sys.stdout.flush()
+
+    # Returns the written characters count
+    return written
+
+# Function to format the console results line by line (every wait and trivial dupe case, or only the summary)
+def FormatResults(results, count, matching_offsets, mission_stacks, full=True):
+    yield Colorize("There are {} mission waits in the SCM.".format(count), "yellow") + "\n"
+    
+    yield "\n"
+
+    # Prints only the trivial dupes counts in summary mode
+    if not full:
+        yield "{} trivial dupes cases found at {} local offsets.\n".format(sum(len(cases) for cases in matching_offsets.values()), len(matching_offsets))
+
+        yield "\n"
+        return
+
+    # Prints all the waits details
+    for index, (wait_offsets, next_instruction_offsets, mission_name) in enumerate(results, start=1):
+        yield Colorize(f"Wait N°{index} (Mission: {mission_name}):", "cyan") + "\n" # Prints the wait number and the mission name
+        
+        yield "  Global Offset of the Wait Instruction: {}\n".format(wait_offsets[0]) # Prints the Global Offset of the Wait Instruction
+        yield "  Local Offset of the Wait Instruction: {}\n".format(wait_offsets[1]) # Prints the Local Offset of the Wait Instruction
+        yield "  Global Offset of the Next Instruction: {}\n".format(next_instruction_offsets[0]) # Prints the Global Offset of the Next Instruction
+        yield "  Local Offset of the Next Instruction: {}\n".format(next_instruction_offsets[1]) # Prints the Local Offset of the Next Instruction
+        
+        yield "\n"
+        
+    # Prints matching offsets section
+    if matching_offsets:
+        yield Colorize("The matching local offsets found in this SCM are:", "yellow") + "\n"
+        # Iterates through the matching offsets and prints them
+        for local_offset, cases in matching_offsets.items():
+            yield Colorize(f"Local Offset: {local_offset}", "cyan") + "\n"
+            # Iterates through the cases and prints them
+            for idx, case in enumerate(cases, start=1):
+                ((wait_offsets1, next_instr1, mission1), (other_offsets, _, mission2)) = case
+                yield Colorize(f"  Case {idx}:", "green") + "\n" # Prints the case number
+                yield f"    From Wait (Mission: {mission1}):\n" # Prints the mission name
+                yield f"      Mission Stack (Local Offset after first gosub): {mission_stacks.get(mission1)}\n" # Prints the mission stack of the first mission
+                yield f"      Global Offset: {wait_offsets1[0]}, Local Offset: {wait_offsets1[1]}\n" # Prints the Global and Local Offsets of the Wait Instruction
+                yield f"      Next Instruction: Global Offset: {next_instr1[0]}, Local Offset: {next_instr1[1]}\n" # Prints the Global and Local Offsets of the Next Instruction
+                yield f"    Matches With (Mission: {mission2}):\n" # Prints the mission name that matches with the previous one
+                yield f"      Mission Stack (Local Offset after first gosub): {mission_stacks.get(mission2)}\n" # Prints the mission stack of the second mission
+                yield f"      Global Offset: {other_offsets[0]}, Local Offset: {other_offsets[1]}\n" # Prints the Global and Local Offsets of the matching instruction
+                
+                yield "\n"
+    else:
+        # Prints that no matching local offsets were found
+        yield Colorize("No matching local offsets found.", "red") + "\n"
+        
+        yield "\n"
+
+# Function to count the number of mission waits
+def MissionsWaitsCounter(file_path):
+    # Returns the count of waits lines that has 2 numbers between brackets
+    return LoadScmData(file_path, scm_cache_dir)[0]
+
+# Function to get wait instructions from SCM file
+def GetWaitsLines(file_path):
+    # Returns the wait instructions with their next instructions and mission names
+    return LoadScmData(file_path, scm_cache_dir)[1]
+
+# Class to analyse a GTA SCM file from other scripts, each result being computed on its first access and then kept (nothing is written or printed)
+class ScmAnalysis:
+    # Function to initialize the analysis of a SCM file (optionally through the parse cache and parsed by worker processes, or with the control flow graphs collected in the same scan)
+    def __init__(self, file_path, cache_dir=None, parse_workers=None, with_control_flow=False):
+        self.file_path = file_path # SCM file path
+        self.cache_dir = cache_dir # Parse cache directory path (None to always parse the SCM file)
+        self.parse_workers = parse_workers # Worker processes parsing the missions of the SCM file
+        self.with_control_flow = with_control_flow # Checks if the control flow graphs are collected in the scan of the SCM data (the parse cache and workers are then not used)
+
+    # Function to get the results of the single scan collecting the SCM data and the control flow graphs
+    @cached_property
+    def scan_results(self):
+        return RunScmAnalyzers(self.file_path, [ScmWaitsAnalyzer(self.file_path), ScmStacksAnalyzer(self.file_path), ScmInstructionIndexAnalyzer(self.file_path), ScmControlFlowAnalyzer(self.file_path)])
+
+    # Function to get the waits count, the waits, the mission stacks and the instruction index of the SCM file (from a single scan)
+    @cached_property
+    def scm_data(self):
+        if self.with_control_flow:
+            return (*self.scan_results["waits"], self.scan_results["stacks"], self.scan_results["instructions"])
+        return LoadScmData(self.file_path, self.cache_dir, parse_workers=self.parse_workers)
+
+    # Function to get the count of waits lines
+    @cached_property
+    def waits_count(self):
+        return self.scm_data[0]
+
+    # Function to get the waits with their next instructions and mission names
+    @cached_property
+    def waits(self):
+        return self.scm_data[1]
+
+    # Function to get the mission stacks
+    @cached_property
+    def mission_stacks(self):
+        return self.scm_data[2]
+
+    # Function to get the instruction index
+    @cached_property
+    def instructions(self):
+        return self.scm_data[3]
+
+    # Function to get the trivial dupes grouped by local offset (the join runs only when they are needed)
+    @cached_property
+    def trivial_dupes(self):
+        return FindMatchingLocalOffsets(self.waits, self.instructions)
+
+    # Function to get the control flow graphs of the missions (from the scan of the SCM data if they are collected in it, else from a scan of their own), each graph being built on its first request
+    @cached_property
+    def control_flow(self):
+        if self.with_control_flow:
+            return self.scan_results["control_flow"]
+        return LoadScmControlFlow(self.file_path)
+
+# Function to run the whole analysis of a GTA SCM file and save its three reports to an output directory
+def AnalyseScmFile(file_path, output_dir, cache_dir=None, scm_data=None, compress=False):
+    # Variable to store the start time of the analysis
+    start_time = time.perf_counter()
+
+    # Gets the waits, the mission stacks and the instruction index (unless they were already collected), then the trivial dupes
+    missions_waits_count, waitsoffsets, mission_stacks, instruction_index = scm_data or LoadScmData(file_path, cache_dir)
+    matching_offsets = FindMatchingLocalOffsets(waitsoffsets, instruction_index)
+
+    # Output files paths of the SCM file (each report in its own directory, like the default output)
+    output_path_missions_waits = os.path.join(output_dir, "Mission_Waits", "mission_waits_output.txt")
+    output_path_missions_compatibilities = os.path.join(output_dir, "Missions_Compatibilities", "missions_compatibilities_output.txt")
+    output_path_trivial_dupes = os.path.join(output_dir, "Trivial_Dupes", "trivial_dupes_output.txt")
+
+    # Creates the output directories and saves the reports
+    for output_path in (output_path_missions_waits, output_path_missions_compatibilities, output_path_trivial_dupes):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    SaveMissionWaitsDataToFile(output_path_missions_waits, waitsoffsets, missions_waits_count, compress)
+    SaveMissionStacksToFile(output_path_missions_compatibilities, mission_stacks, compress)
+    SaveTrivialDupesDataToFile(output_path_trivial_dupes, matching_offsets, mission_stacks, compress)
+
+    # Returns the summary of the SCM file
+    return {
+        "file": file_path, # SCM file path
+        "output_dir": output_dir, # Output directory of the reports
+        "waits_count": missions_waits_count, # Count of waits lines
+        "waits": len(waitsoffsets), # Waits with a next instruction
+        "missions": len(mission_stacks), # Missions with a stack
+        "trivial_dupes": sum(len(cases) for cases in matching_offsets.values()), # Trivial dupes cases
+        "seconds": time.perf_counter() - start_time, # Analysis time
+    }
+
+# Function to find the SCM files of directories (all the .txt files) or glob patterns
+def FindScmFiles(patterns):
+    # List to store the SCM files paths (without duplicates, in the given order)
+    scm_files = []
+
+    # Iterates through the directories and glob patterns
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "*.txt"))
+        else:
+            matches = glob.glob(pattern)
+
+        # Adds the files that weren't found yet
+        for match in sorted(matches):
+            if os.path.isfile(match) and match not in scm_files:
+                scm_files.append(match)
+
+    # Returns the SCM files paths
+    return scm_files
+
+# Function to format the combined summary of a batch run
+def FormatBatchSummary(summaries):
+    # Writes the headers
+    lines = ["{:<60}{:<15}{:<15}{:<15}{:<15}{:<15}".format("SCM File", "Waits Count", "Waits", "Missions", "Trivial Dupes", "Seconds")]
+
+    # Adds a separator line below the headers
+    lines.append("=" * 135)
+
+    # Writes a row for each SCM file (or its error)
+    for summary in summaries:
+        if "error" in summary:
+            lines.append("{:<60}Error: {}".format(os.path.basename(summary["file"]), summary["error"]))
+        else:
+            lines.append("{:<60}{:<15}{:<15}{:<15}{:<15}{:<15.2f}".format(
+                os.path.basename(summary["file"]), # SCM file name
+                summary["waits_count"], # Count of waits lines
+                summary["waits"], # Waits with a next instruction
+                summary["missions"], # Missions with a stack
+                summary["trivial_dupes"], # Trivial dupes cases
+                summary["seconds"] # Analysis time
+            ))
+
+    # Returns the summary text
+    return "\n".join(lines) + "\n"
+
+# Function to analyse many SCM files in parallel, each one in its own output subdirectory
+def RunBatch(patterns, output_root, workers=None, compress=False):
+    # Finds the SCM files to process
+    scm_files = FindScmFiles(patterns)
+
+    # Checks if there is anything to process
+    if not scm_files:
+        PrintMessage("No SCM files found.", "red")
+        return []
+
+    # Gets an output subdirectory for each SCM file, named after the file (with a suffix for repeated names)
+    output_dirs = []
+    for file_path in scm_files:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        output_dir = os.path.join(output_root, name)
+        suffix = 1
+        while output_dir in output_dirs:
+            suffix += 1
+            output_dir = os.path.join(output_root, f"{name}_{suffix}")
+        output_dirs.append(output_dir)
+
+    PrintMessage(f"Processing {len(scm_files)} SCM files...", "yellow")
+
+    PrintMessage()
+
+    # List to store the summary of each SCM file (in the order of the files)
+    summaries = []
+
+    # Spreads the SCM files across the worker processes
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=max(1, min(workers or os.cpu_count() or 1, len(scm_files))), initializer=SetVerbosity, initargs=(console_verbosity,)) as executor:
+        futures = [executor.submit(AnalyseScmFile, file_path, output_dir, scm_cache_dir, None, compress) for file_path, output_dir in zip(scm_files, output_dirs)]
+
+        # Collects the summaries (an error on one file doesn't stop the others)
+        for file_path, future in zip(scm_files, futures):
+            try:
+                summaries.append(future.result())
+            except Exception as error:
+                summaries.append({"file": file_path, "error": str(error)})
+
+    # Prints and saves the combined summary
+    summary_text = FormatBatchSummary(summaries)
+    summary_path = os.path.join(output_root, "batch_summary.txt")
+    os.makedirs(output_root, exist_ok=True)
+    with open(summary_path, "w") as file:
+        file.write(summary_text)
+
+    PrintMessage()
+
+    PrintMessage(summary_text)
+
+    PrintMessage(f"Batch summary saved to: {summary_path}", "green")
+
+    # Returns the summaries
+    return summaries
+
+# Function to decode a compiled main.scm file directly and save its three reports (optionally checking it against its decompiled text)
+def RunBinary(scm_path, opcodes_path, output_root, game="gta3", names_path=None, oracle_path=None, compress=False):
+    PrintMessage(f"Decoding the {SCM_GAMES[game]['name']} compiled SCM file...", "yellow")
+
+    PrintMessage()
+
+    # Decodes the compiled SCM file with the opcodes table of the game
+    mission_names = LoadMissionNames(names_path) if names_path else None
+    scm_data = CollectBinaryScmData(scm_path, LoadOpcodeTable(opcodes_path), game, mission_names)
+
+    # Compares the decoded data with the data of the decompiled text (the reference)
+    if oracle_path:
+        differences = CompareScmData(CollectScmData(oracle_path), scm_data)
+        if differences:
+            PrintMessage(f"{len(differences)} differences with the decompiled text:", "red")
+            for difference in differences:
+                PrintMessage(f"  {difference}")
+        else:
+            PrintMessage("No differences with the decompiled text.", "green")
+
+        PrintMessage()
+
+    # Saves the reports in an output subdirectory named after the compiled SCM file
+    output_dir = os.path.join(output_root, os.path.splitext(os.path.basename(scm_path))[0])
+    summary = AnalyseScmFile(scm_path, output_dir, scm_data=scm_data, compress=compress)
+
+    PrintMessage()
+
+    PrintMessage(FormatBatchSummary([summary]))
+
+    PrintMessage(f"Reports saved to: {output_dir}", "green")
+
+    # Returns the summary
+    return summary
+
+# Function to analyse a decompiled SCM file incrementally (only its changed mission blocks are parsed and matched again)
+def RunIncremental(file_path, output_dir, compress=False):
+    PrintMessage("Analysing the SCM file incrementally...", "yellow")
+
+    PrintMessage()
+
+    # Analyses the SCM file reusing the results of the last run
+    _, _, summary = AnalyseScmFileIncrementally(file_path, output_dir, scm_cache_dir, compress)
+
+    PrintMessage(f"{summary['reparsed_blocks']} of {summary['blocks']} blocks parsed again.", "cyan")
+
+    PrintMessage()
+
+    PrintMessage(FormatBatchSummary([summary]))
+
+    PrintMessage(f"Reports saved to: {output_dir}", "green")
+
+    # Returns the summary
+    return summary
+
+# Profile report format (bump the version whenever the report fields change)
+PROFILE_FORMAT_VERSION = 1
+PROFILE_REPORT_FILE_NAME = "profile_report.json" # Profile report saved next to the output directories
+
+# Class to time the stages of a run and measure their memory with tracemalloc (the counts of each stage are added by the caller)
+class ScmProfiler:
+    # Function to initialize the stages and start the memory tracing (the tracing slows down the allocations, so it can be skipped to get undistorted times)
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory # Checks if the memory of the stages is measured
+        self.stages = [] # Results of the stages in run order
+        self.stage_functions = {} # Function and arguments of each stage (to run the hottest stage again under cProfile)
+        self.peak_memory = 0 # Peak of traced memory of the whole run
+        self.start_time = time.perf_counter() # Start time of the run
+        self.tracemalloc = None # Memory tracing module (imported only when the memory is measured)
+        if trace_memory:
+            import tracemalloc
+            self.tracemalloc = tracemalloc
+            tracemalloc.start()
+
+    # Function to run a stage measuring its time and memory, returning the stage result
+    def Run(self, stage, function, *arguments):
+        # Takes the memory snapshot before the stage
+        if self.trace_memory:
+            self.tracemalloc.reset_peak()
+            memory_before = self.tracemalloc.get_traced_memory()[0]
+
+        # Runs and times the stage
+        start_time = time.perf_counter()
+        result = function(*arguments)
+        seconds = time.perf_counter() - start_time
+
+        # Takes the memory snapshot after the stage
+        if self.trace_memory:
+            memory_after, peak_memory = self.tracemalloc.get_traced_memory()
+            self.peak_memory = max(self.peak_memory, peak_memory)
+
+        # Stores the results of the stage
+        self.stages.append({
+            "stage": stage, # Stage name
+            "seconds": seconds, # Stage time
+            "peak_memory": peak_memory - memory_before if self.trace_memory else None, # Peak of memory allocated by the stage (bytes)
+            "retained_memory": memory_after - memory_before if self.trace_memory else None, # Memory still allocated after the stage (bytes)
+            "lines": 0, # Lines scanned
+            "records": 0, # Records produced
+            "bytes_written": 0, # Bytes (characters for the console) written
+        })
+        self.stage_functions[stage] = (function, arguments)
+
+        # Returns the stage result
+        return result
+
+    # Function to add the counts (lines scanned, records produced, bytes written) of a stage
+    def Count(self, stage, **counts):
+        for stage_results in self.stages:
+            if stage_results["stage"] == stage:
+                stage_results.update(counts)
+
+    # Function to get the name of the slowest stage
+    def GetHottestStage(self):
+        return max(self.stages, key=lambda stage_results: stage_results["seconds"])["stage"]
+
+    # Function to stop the memory tracing and get the report of the run
+    def Finish(self, **details):
+        import platform
+        if self.trace_memory:
+            self.tracemalloc.stop()
+
+        # Returns the report with the details of the run
+        return dict(
+            format_version=PROFILE_FORMAT_VERSION, # Report format version
+            created=time.strftime("%Y-%m-%d %H:%M:%S"), # Run date
+            python=platform.python_version(), # Python version
+            platform=platform.platform(), # Operating system
+            **details,
+            total_seconds=time.perf_counter() - self.start_time, # Run time (with the profiling overhead)
+            peak_memory=self.peak_memory if self.trace_memory else None, # Peak of traced memory of the run (bytes)
+            hottest_stage=self.GetHottestStage(), # Slowest stage
+            stages=self.stages, # Results of the stages
+        )
+
+    # Function to run a stage again under cProfile (without console output) and dump its statistics
+    def DumpStageProfile(self, stage, output_path):
+        function, arguments = self.stage_functions[stage]
+        profile = cProfile.Profile()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            profile.runcall(function, *arguments)
+        profile.dump_stats(output_path)
+
+# Function to count the records of a SCM scanner as they are consumed
+def CountRecords(records, counts):
+    for record in records:
+        counts["records"] += 1
+        yield record
+
+# Function to count the lines of a file
+def CountFileLines(file_path):
+    # Variables to store the lines count and the last byte read
+    lines_count = 0
+    last_byte = b"\n"
+
+    # Counts the line breaks in 1 MB chunks
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            lines_count += chunk.count(b"\n")
+            last_byte = chunk[-1:]
+
+    # Returns the lines count (with a last line without line break)
+    return lines_count + (last_byte != b"\n")
+
+# Function to format the stages table of a profile report
+def FormatProfileReport(report):
+    # Writes the headers
+    lines = ["{:<30}{:>12}{:>15}{:>12}{:>12}{:>16}".format("Stage", "Seconds", "Peak Memory", "Lines", "Records", "Bytes Written")]
+
+    # Adds a separator line below the headers
+    lines.append("=" * 97)
+
+    # Writes a row for each stage
+    for stage_results in report["stages"]:
+        lines.append("{:<30}{:>12.3f}{:>15}{:>12}{:>12}{:>16}".format(
+            stage_results["stage"], # Stage name
+            stage_results["seconds"], # Stage time
+            "{:.1f} MB".format(stage_results["peak_memory"] / (1 << 20)) if stage_results["peak_memory"] is not None else "-", # Peak of memory of the stage
+            stage_results["lines"], # Lines scanned
+            stage_results["records"], # Records produced
+            stage_results["bytes_written"] # Bytes written
+        ))
+
+    # Returns the table text
+    return "\n".join(lines) + "\n"
+
+# Function to run the analysis of a GTA SCM file stage by stage with the profiler, saving the reports and the profile report next to them
+def RunProfile(file_path, compress=False, dump_hottest_stage=False, trace_memory=True):
+    PrintMessage("Profiling the script stages...", "yellow")
+
+    PrintMessage()
+
+    # Creates the output directories
+    CreateOutputDirectories()
+
+    # Variables to store the profiler and the records count of the scan
+    profiler = ScmProfiler(trace_memory)
+    scan_counts = {"records": 0}
+
+    # Parses the SCM file (always scanned, the parse cache is skipped so the parser is measured)
+    scm_data = profiler.Run("parse", lambda: CollectScmRecords(file_path, CountRecords(ScanScmFile(file_path), scan_counts)))
+    missions_waits_count, waitsoffsets, mission_stacks, instruction_index = scm_data
+    profiler.Count("parse", lines=CountFileLines(file_path), records=scan_counts["records"])
+
+    # Finds the trivial dupes
+    matching_offsets = profiler.Run("find_matching_local_offsets", FindMatchingLocalOffsets, waitsoffsets, instruction_index)
+    trivial_dupes_count = sum(len(cases) for cases in matching_offsets.values())
+    profiler.Count("find_matching_local_offsets", records=trivial_dupes_count)
+
+    # Prints the results to the console
+    written = profiler.Run("print_results", PrintResults, waitsoffsets, missions_waits_count, matching_offsets, mission_stacks)
+    profiler.Count("print_results", bytes_written=written)
+
+    # Saves the three reports
+    saved_file_missions_waits = profiler.Run("save_mission_waits", SaveMissionWaitsDataToFile, output_file_missions_waits, waitsoffsets, missions_waits_count, compress)
+    profiler.Count("save_mission_waits", records=len(waitsoffsets), bytes_written=os.path.getsize(saved_file_missions_waits))
+    saved_file_missions_compatibilities = profiler.Run("save_mission_stacks", SaveMissionStacksToFile, output_file_missions_compatibilities, mission_stacks, compress)
+    profiler.Count("save_mission_stacks", records=len(mission_stacks), bytes_written=os.path.getsize(saved_file_missions_compatibilities))
+    saved_file_trivial_dupes = profiler.Run("save_trivial_dupes", SaveTrivialDupesDataToFile, output_file_trivial_dupes, matching_offsets, mission_stacks, compress)
+    profiler.Count("save_trivial_dupes", records=trivial_dupes_count, bytes_written=os.path.getsize(saved_file_trivial_dupes))
+
+    # Gets the profile report
+    output_dir = os.path.dirname(mission_waits_dir)
+    report = profiler.Finish(
+        scm_file=file_path, # SCM file path
+        scm_file_size=os.path.getsize(file_path), # SCM file size
+        scm_file_hash=HashScmFile(file_path), # SCM file content hash (to tell the SCM versions apart)
+        verbosity=console_verbosity, # Console verbosity level
+        compress=compress, # Compressed reports
+        cprofile_dump=None, # cProfile statistics of the hottest stage
+    )
+
+    # Runs the hottest stage again under cProfile and dumps its statistics
+    if dump_hottest_stage:
+        report["cprofile_dump"] = os.path.join(output_dir, f"profile_{report['hottest_stage']}.prof")
+        profiler.DumpStageProfile(report["hottest_stage"], report["cprofile_dump"])
+
+    # Saves the profile report
+    report_path = os.path.join(output_dir, PROFILE_REPORT_FILE_NAME)
+    with open(report_path, "w") as file:
+        json.dump(report, file, indent=4)
+        file.write("\n")
+
+    PrintMessage(FormatProfileReport(report))
+
+    PrintMessage(f"Hottest stage: {report['hottest_stage']}", "cyan")
+
+    PrintMessage()
+
+    # Prints where the cProfile statistics were saved
+    if report["cprofile_dump"]:
+        PrintMessage(f"cProfile statistics saved to: {report['cprofile_dump']}", "green")
+
+        PrintMessage()
+
+    PrintMessage(f"Profile report saved to: {report_path}", "green")
+
+    # Returns the profile report
+    return report
+
+# Function to get the instruction index ranges of each mission (a mission name can own many blocks)
+def GetMissionInstructionRanges(instruction_index):
+    # Dictionary to store the (start, end) ranges of each mission name
+    mission_ranges = {}
+
+    # Splits the instructions into runs of the same mission id
+    start = 0
+    mission_ids = instruction_index.mission_ids
+    for index in range(1, len(instruction_index) + 1):
+        if index == len(instruction_index) or mission_ids[index] != mission_ids[start]:
+            mission_ranges.setdefault(instruction_index.mission_names[mission_ids[start]], []).append((start, index))
+            start = index
+
+    # Returns the ranges of each mission
+    return mission_ranges
+
+# Function to compute the fingerprint of each mission from its opcodes, local offsets and waits (two missions with the same fingerprint have the same waits and trivial dupes)
+def GetMissionFingerprints(instruction_index, mission_ranges, waits_by_mission):
+    # Dictionary to store the fingerprint of each mission
+    fingerprints = {}
+
+    # Hashes the opcode and local offset columns of the mission ranges, then the local offsets of its waits
+    for mission_name, ranges in mission_ranges.items():
+        mission_hash = hashlib.blake2b(digest_size=16)
+        for start, end in ranges:
+            mission_hash.update(instruction_index.opcodes[start:end].tobytes())
+            mission_hash.update(instruction_index.local_offsets[start:end].tobytes())
+        for wait_offsets, next_instr_offsets, _ in waits_by_mission.get(mission_name, []):
+            mission_hash.update(struct.pack("<ii", wait_offsets[1], next_instr_offsets[1]))
+        fingerprints[mission_name] = mission_hash.digest()
+
+    # Returns the fingerprints
+    return fingerprints
+
+# Function to align the waits of a mission in two versions of a SCM file through its opcodes stream (with the instruction sizes), returning the added, removed and shifted waits
+def AlignMissionWaits(old_index, old_ranges, old_waits, new_index, new_ranges, new_waits):
+
+    # Function to get the (opcode, size) stream of a mission and the position of each wait in it
+    def GetOpcodesAndWaits(instruction_index, ranges, waits):
+        opcodes = [(instruction_index.opcodes[index], instruction_index.local_offsets[index + 1] - instruction_index.local_offsets[index] if index + 1 < end else None) for start, end in ranges for index in range(start, end)]
+        positions = {}
+        position = 0
+        for start, end in ranges:
+            for wait in waits:
+                index = bisect_left(instruction_index.global_offsets, wait[0][0], start, end)
+                if index < end and instruction_index.global_offsets[index] == wait[0][0]:
+                    positions[position + index - start] = wait
+            position += end - start
+        return opcodes, positions
+
+    # Gets the opcodes and the waits positions of both versions
+    old_opcodes, old_positions = GetOpcodesAndWaits(old_index, old_ranges, old_waits)
+    new_opcodes, new_positions = GetOpcodesAndWaits(new_index, new_ranges, new_waits)
+
+    # Maps the positions of the matching instructions of the old version to the new version
+    position_map = {}
+    for old_start, new_start, size in difflib.SequenceMatcher(None, old_opcodes, new_opcodes, autojunk=False).get_matching_blocks():
+        for offset in range(size):
+            position_map[old_start + offset] = new_start + offset
+
+    # Lists to store the removed and shifted waits
+    removed, shifted = [], []
+
+    # Pairs each old wait with its aligned new wait
+    paired_positions = set()
+    for old_position, old_wait in old_positions.items():
+        new_wait = new_positions.get(position_map.get(old_position))
+        if new_wait is None:
+            removed.append(old_wait)
+            continue
+        paired_positions.add(position_map[old_position])
+
+        # Checks if the wait or its next instruction moved
+        if (old_wait[0][1], old_wait[1][1]) != (new_wait[0][1], new_wait[1][1]):
+            shifted.append((old_wait, new_wait))
+
+    # Lists the new waits without an old wait
+    added = [new_wait for new_position, new_wait in new_positions.items() if new_position not in paired_positions]
+
+    # Returns the waits differences (in local offset order)
+    return sorted(added, key=lambda wait: wait[0][1]), sorted(removed, key=lambda wait: wait[0][1]), sorted(shifted, key=lambda waits: waits[0][0][1])
+
+# Function to get the keys of the trivial dupes cases (the global offsets are left out, they move between versions)
+def GetTrivialDupesKeys(matching_offsets):
+    return {(wait[2], wait[0][1], wait[1][1], match[2]) for cases in matching_offsets.values() for wait, match in cases}
+
+# Function to get the keys of the trivial dupes cases that involve the touched missions, joining only the waits that can be in one
+def GetTouchedTrivialDupesKeys(waitsresults, instruction_index, mission_ranges, touched_missions):
+    # Set to store the local offsets of the instructions of the touched missions
+    touched_local_offsets = set()
+    for mission in touched_missions:
+        for start, end in mission_ranges.get(mission, []):
+            touched_local_offsets.update(instruction_index.local_offsets[start:end])
+
+    # Keeps the waits of the touched missions and the waits whose next instruction local offset is in a touched mission
+    touched_waits = [wait for wait in waitsresults if wait[2] in touched_missions or wait[1][1] in touched_local_offsets]
+
+    # Returns the keys of the cases of the touched missions
+    return {key for key in GetTrivialDupesKeys(FindMatchingLocalOffsets(touched_waits, instruction_index)) if key[0] in touched_missions or key[3] in touched_missions}
+
+# Function to compare two versions of a SCM file, hashing the missions first and aligning the waits only of the changed missions
+def DiffScmData(old_data, new_data):
+    # Gets the data of both versions
+    _, old_waits, old_stacks, old_index = old_data
+    _, new_waits, new_stacks, new_index = new_data
+
+    # Groups the waits by mission
+    old_waits_by_mission, new_waits_by_mission = {}, {}
+    for wait in old_waits:
+        old_waits_by_mission.setdefault(wait[2], []).append(wait)
+    for wait in new_waits:
+        new_waits_by_mission.setdefault(wait[2], []).append(wait)
+
+    # Gets the instruction ranges and the fingerprints of the missions
+    old_ranges, new_ranges = GetMissionInstructionRanges(old_index), GetMissionInstructionRanges(new_index)
+    old_fingerprints = GetMissionFingerprints(old_index, old_ranges, old_waits_by_mission)
+    new_fingerprints = GetMissionFingerprints(new_index, new_ranges, new_waits_by_mission)
+
+    # Aligns the missions by name (in the order of the new version, then the removed ones)
+    added_missions = [mission for mission in new_fingerprints if mission not in old_fingerprints]
+    removed_missions = [mission for mission in old_fingerprints if mission not in new_fingerprints]
+    changed_missions = [mission for mission in new_fingerprints if mission in old_fingerprints and new_fingerprints[mission] != old_fingerprints[mission]]
+    unchanged_count = len(new_fingerprints) - len(added_missions) - len(changed_missions)
+
+    # Aligns the waits of the changed missions only
+    waits_differences = {}
+    for mission in changed_missions:
+        waits_differences[mission] = AlignMissionWaits(
+            old_index, old_ranges[mission], old_waits_by_mission.get(mission, []),
+            new_index, new_ranges[mission], new_waits_by_mission.get(mission, [])
+        )
+
+    # Compares the stacks of all the missions
+    stack_changes = [(mission, old_stacks.get(mission), new_stacks.get(mission)) for mission in list(new_stacks) + [mission for mission in old_stacks if mission not in new_stacks] if old_stacks.get(mission) != new_stacks.get(mission)]
+
+    # Compares the trivial dupes cases that involve a changed, added or removed mission (the others are the same in both versions)
+    touched_missions = set(changed_missions) | set(added_missions) | set(removed_missions)
+    old_dupes, new_dupes = set(), set()
+    if touched_missions:
+        old_dupes = GetTouchedTrivialDupesKeys(old_waits, old_index, old_ranges, touched_missions)
+        new_dupes = GetTouchedTrivialDupesKeys(new_waits, new_index, new_ranges, touched_missions)
+
+    # Returns the differences
+    return {
+        "unchanged_missions": unchanged_count, # Count of missions with the same fingerprint
+        "changed_missions": changed_missions, # Missions with a different fingerprint
+        "added_missions": added_missions, # Missions only in the new version
+        "removed_missions": removed_missions, # Missions only in the old version
+        "waits": waits_differences, # Added, removed and shifted waits of each changed mission
+        "added_missions_waits": {mission: new_waits_by_mission.get(mission, []) for mission in added_missions}, # Waits of the added missions
+        "removed_missions_waits": {mission: old_waits_by_mission.get(mission, []) for mission in removed_missions}, # Waits of the removed missions
+        "stacks": stack_changes, # (Mission, old stack, new stack) of the changed stacks
+        "new_trivial_dupes": sorted(new_dupes - old_dupes), # Trivial dupes cases only in the new version
+        "lost_trivial_dupes": sorted(old_dupes - new_dupes), # Trivial dupes cases only in the old version
+    }
+
+# Function to format the differences between two versions of a SCM file section by section
+def FormatScmDiff(diff, old_path, new_path):
+    yield f"SCM diff: {old_path} -> {new_path}\n\n"
+
+    # Writes the missions summary
+    yield "Missions: {} unchanged, {} changed, {} added, {} removed\n".format(diff["unchanged_missions"], len(diff["changed_missions"]), len(diff["added_missions"]), len(diff["removed_missions"]))
+    yield "Stack changes: {}\n".format(len(diff["stacks"]))
+    yield "Trivial dupes: {} new, {} lost\n".format(len(diff["new_trivial_dupes"]), len(diff["lost_trivial_dupes"]))
+
+    yield "\n"
+
+    # Writes the waits differences of the changed missions
+    for mission in diff["changed_missions"]:
+        added, removed, shifted = diff["waits"][mission]
+        yield f"Changed mission: {mission} ({len(added)} added, {len(removed)} removed, {len(shifted)} shifted waits)\n"
+        for wait_offsets, next_instr_offsets, _ in added:
+            yield f"  Added wait: Local Offset: {wait_offsets[1]}, Next Instruction Local Offset: {next_instr_offsets[1]}\n"
+        for wait_offsets, next_instr_offsets, _ in removed:
+            yield f"  Removed wait: Local Offset: {wait_offsets[1]}, Next Instruction Local Offset: {next_instr_offsets[1]}\n"
+        for old_wait, new_wait in shifted:
+            yield f"  Shifted wait: Local Offset: {old_wait[0][1]} -> {new_wait[0][1]}, Next Instruction Local Offset: {old_wait[1][1]} -> {new_wait[1][1]}\n"
+
+        yield "\n"
+
+    # Writes the added and removed missions with their waits
+    for title, missions_waits in (("Added mission", diff["added_missions_waits"]), ("Removed mission", diff["removed_missions_waits"])):
+        for mission, waits in missions_waits.items():
+            yield f"{title}: {mission} ({len(waits)} waits)\n"
+
+            yield "\n"
+
+    # Writes the stack changes
+    if diff["stacks"]:
+        yield "{:<40}{:<15}{:<15}\n".format("Mission Name", "Old Stack", "New Stack")
+        yield "=" * 70 + "\n"
+        for mission, old_stack, new_stack in diff["stacks"]:
+            yield "{:<40}{:<15}{:<15}\n".format(mission, "-" if old_stack is None else old_stack, "-" if new_stack is None else new_stack)
+
+        yield "\n"
+
+    # Writes the new and lost trivial dupes cases
+    for title, cases in (("New trivial dupes", diff["new_trivial_dupes"]), ("Lost trivial dupes", diff["lost_trivial_dupes"])):
+        if cases:
+            yield f"{title}:\n"
+            for mission1, wait_local_offset, next_local_offset, mission2 in cases:
+                yield f"  Wait (Mission: {mission1}) Local Offset: {wait_local_offset}, Next Instruction Local Offset: {next_local_offset} matches Mission: {mission2}\n"
+
+            yield "\n"
+
+# Function to compare two versions of a decompiled SCM file and save the differences report
+def RunDiff(old_path, new_path, output_root, compress=False):
+    PrintMessage("Comparing the SCM files...", "yellow")
+
+    PrintMessage()
+
+    # Parses both SCM files (through the parse cache) and compares them
+    start_time = time.perf_counter()
+    diff = DiffScmData(LoadScmData(old_path, scm_cache_dir), LoadScmData(new_path, scm_cache_dir))
+    seconds = time.perf_counter() - start_time
+
+    # Saves the differences report
+    output_dir = os.path.join(output_root, "Diff")
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, "{}_vs_{}.txt".format(os.path.splitext(os.path.basename(old_path))[0], os.path.splitext(os.path.basename(new_path))[0]))
+    with OpenReportFile(output_path, compress) as file:
+        WriteInChunks(file, FormatScmDiff(diff, old_path, new_path))
+
+    # Prints the summary of the differences
+    PrintMessage("Missions: {} unchanged, {} changed, {} added, {} removed".format(diff["unchanged_missions"], len(diff["changed_missions"]), len(diff["added_missions"]), len(diff["removed_missions"])), "cyan")
+    PrintMessage("Stack changes: {}".format(len(diff["stacks"])), "cyan")
+    PrintMessage("Trivial dupes: {} new, {} lost".format(len(diff["new_trivial_dupes"]), len(diff["lost_trivial_dupes"])), "cyan")
+
+    PrintMessage()
+
+    PrintMessage(f"Compared in {seconds:.2f} seconds.")
+
+    PrintMessage()
+
+    PrintMessage(f"Differences saved to: {GetReportPath(output_path, compress)}", "green")
+
+    # Returns the differences
+    return diff
+
+# Opcodes of the control flow instructions (without the negation bit)
+OPCODE_WAIT = 0x0001 # "wait"
+OPCODE_GOTO = 0x0002 # "goto @LABEL"
+OPCODE_GOTO_IF_TRUE = 0x004C # "goto_if_true @LABEL"
+OPCODE_GOTO_IF_FALSE = 0x004D # "goto_if_false @LABEL"
+OPCODE_END_THREAD = 0x004E # "end_thread"
+OPCODE_GOSUB = 0x0050 # "gosub @LABEL" (pushes the local offset of the next instruction)
+OPCODE_RETURN = 0x0051 # "return"
+OPCODE_GOSUB_FILE = 0x02CD # "call @LABEL" (gosub of the main script)
+
+# Class to store the control flow graph of a mission (its instructions, label index and jump edges) and answer memoized reachability queries
+class ScmMissionGraph:
+    def __init__(self, mission_name):
+        # Mission name of the graph
+        self.mission_name = mission_name
+
+        # Instruction columns (one item per instruction, in file order; a position is an index in them)
+        self.local_offsets = array("i") # Local offsets (int32)
+        self.opcodes = array("H") # Opcodes (uint16, including the negation bit)
+
+        # Label index and instruction lookup
+        self.labels = {} # Local offset of each label of the mission
+        self.positions = {} # Position of the instruction at each local offset
+
+        # Edges of the graph
+        self.successors = [] # Positions that can run right after each instruction (a gosub continues after its return)
+        self.calls = {} # Target position of each gosub
+        self.unresolved_jumps = [] # (Position, label) of the jumps to labels out of the mission
+
+        # Memoized queries results
+        self.between_waits_cache = {} # Instructions run between each wait and the next waits
+        self.subroutines_cache = {} # Body of each gosub target
+        self.gosub_depths_cache = {} # Nested gosubs depth of each gosub target
+
+    # Returns the number of instructions in the graph
+    def __len__(self):
+        return len(self.local_offsets)
+
+    # Function to build the edges of the graph from its instructions ((local offset, opcode, label operand) tuples) and its labels
+    def Build(self, instructions, labels):
+        self.labels = labels
+
+        # Fills the instruction columns
+        for local_offset, opcode, _ in instructions:
+            self.positions.setdefault(local_offset, len(self.local_offsets))
+            self.local_offsets.append(local_offset)
+            self.opcodes.append(opcode)
+
+        # Resolves the jumps through the label index and adds the edges of each instruction
+        for position, (_, opcode, label) in enumerate(instructions):
+            opcode &= 0x7FFF
+            next_positions = (position + 1,) if position + 1 < len(instructions) else ()
+
+            # Gets the target of the jump (None if it isn't a jump or its label isn't in the mission)
+            target = None
+            if label is not None and opcode in (OPCODE_GOTO, OPCODE_GOTO_IF_TRUE, OPCODE_GOTO_IF_FALSE, OPCODE_GOSUB, OPCODE_GOSUB_FILE):
+                target = self.positions.get(self.labels.get(label))
+                if target is None:
+                    self.unresolved_jumps.append((position, label))
+
+            # Adds the edges by the kind of instruction
+            if opcode == OPCODE_GOTO:
+                self.successors.append((target,) if target is not None else ())
+            elif opcode in (OPCODE_GOTO_IF_TRUE, OPCODE_GOTO_IF_FALSE):
+                self.successors.append(next_positions + ((target,) if target is not None else ()))
+            elif opcode in (OPCODE_RETURN, OPCODE_END_THREAD):
+                self.successors.append(())
+            else:
+                self.successors.append(next_positions)
+                if opcode in (OPCODE_GOSUB, OPCODE_GOSUB_FILE) and target is not None:
+                    self.calls[position] = target
+
+    # Function to get the position of the instruction at a local offset (None if there isn't one)
+    def FindPosition(self, local_offset):
+        return self.positions.get(local_offset)
+
+    # Function to check if an instruction is a wait
+    def IsWait(self, position):
+        return self.opcodes[position] & 0x7FFF == OPCODE_WAIT
+
+    # Function to get the instructions that can run between a wait and the next waits (following the jumps and the gosubs), memoized
+    def GetInstructionsBetweenWaits(self, position):
+        if position not in self.between_waits_cache:
+            # Sets to store the instructions run and the next waits reached
+            executed = set()
+            next_waits = set()
+
+            # Walks the graph from the instructions after the wait, stopping at the next waits
+            pending = list(self.successors[position])
+            if position in self.calls:
+                pending.append(self.calls[position])
+            while pending:
+                current = pending.pop()
+                if current in executed or current in next_waits:
+                    continue
+                if self.IsWait(current):
+                    next_waits.add(current)
+                    continue
+                executed.add(current)
+                pending.extend(self.successors[current])
+                if current in self.calls:
+                    pending.append(self.calls[current])
+
+            self.between_waits_cache[position] = (frozenset(executed), frozenset(next_waits))
+
+        # Returns the positions of the instructions run and of the next waits
+        return self.between_waits_cache[position]
+
+    # Function to get the body of a gosub target (the instructions run until its returns, without the nested gosubs) and if it returns, memoized
+    def GetSubroutine(self, target):
+        if target not in self.subroutines_cache:
+            # Variables to store the body and if a return is reached
+            body = set()
+            returns = False
+
+            # Walks the graph from the target (the nested gosubs continue after their return)
+            pending = [target]
+            while pending:
+                current = pending.pop()
+                if current in body:
+                    continue
+                body.add(current)
+                if self.opcodes[current] & 0x7FFF == OPCODE_RETURN:
+                    returns = True
+                pending.extend(self.successors[current])
+
+            self.subroutines_cache[target] = (frozenset(body), returns)
+
+        # Returns the body positions and if the subroutine returns
+        return self.subroutines_cache[target]
+
+    # Function to get the gosub stack depth used by a gosub target (1 plus the depth of its nested gosubs, None for a recursive gosub), memoized
+    def GetGosubDepth(self, target, in_progress=None):
+        if target not in self.gosub_depths_cache:
+            # Checks for a recursive gosub (its depth has no limit)
+            in_progress = in_progress or set()
+            if target in in_progress:
+                return None
+            in_progress.add(target)
+
+            # Gets the depth of the nested gosubs of the body
+            depth = 1
+            for position in self.GetSubroutine(target)[0]:
+                if position in self.calls:
+                    nested_depth = self.GetGosubDepth(self.calls[position], in_progress)
+                    if nested_depth is None:
+                        depth = None
+                        break
+                    depth = max(depth, 1 + nested_depth)
+
+            in_progress.discard(target)
+            self.gosub_depths_cache[target] = depth
+
+        # Returns the gosub stack depth
+        return self.gosub_depths_cache[target]
+
+    # Function to get all the gosub targets of the mission with their callers and stack effects
+    def GetGosubTargets(self):
+        # Dictionary to store the label of each local offset
+        label_names = {}
+        for label, local_offset in self.labels.items():
+            label_names.setdefault(local_offset, label)
+
+        # Groups the gosubs by target
+        callers = {}
+        for position, target in self.calls.items():
+            callers.setdefault(target, []).append(position)
+
+        # List to store the gosub targets
+        gosub_targets = []
+        for target in sorted(callers, key=self.local_offsets.__getitem__):
+            body, returns = self.GetSubroutine(target)
+            gosub_targets.append({
+                "label": label_names.get(self.local_offsets[target]), # Label of the target
+                "local_offset": self.local_offsets[target], # Local offset of the target
+                "callers": [self.local_offsets[position] for position in callers[target]], # Local offsets of the gosubs
+                "return_offsets": [self.local_offsets[position + 1] for position in callers[target] if position + 1 < len(self)], # Local offsets pushed on the gosub stack
+                "returns": returns, # Checks if a return is reached (else the subroutine ends the thread or loops forever)
+                "depth": self.GetGosubDepth(target), # Gosub stack depth used (None for a recursive gosub)
+                "instructions": len(body), # Instructions of the body
+            })
+
+        # Returns the gosub targets
+        return gosub_targets
+
+# Class to store the instructions and labels of each mission of a GTA SCM file, and build and cache the control flow graph of each mission on its first request
+class ScmControlFlow:
+    def __init__(self, mission_instructions, mission_labels):
+        # Instructions ((local offset, opcode, label operand) tuples) and labels (local offset of each label) of each mission, in file order
+        self.mission_instructions = mission_instructions
+        self.mission_labels = mission_labels
+
+        # Graphs of the missions built so far
+        self.graphs = {}
+
+    # Function to get the mission names in file order
+    def GetMissionNames(self):
+        return list(self.mission_instructions)
+
+    # Function to get the control flow graph of a mission, building it on the first request
+    def GetMissionGraph(self, mission_name):
+        if mission_name not in self.graphs:
+            if mission_name not in self.mission_instructions:
+                raise KeyError(f"Unknown mission: {mission_name}")
+
+            # Builds the graph of the mission
+            graph = ScmMissionGraph(mission_name)
+            graph.Build(self.mission_instructions[mission_name], self.mission_labels[mission_name])
+            self.graphs[mission_name] = graph
+
+        # Returns the graph of the mission
+        return self.graphs[mission_name]
+
+    # Function to get the label index of the whole file (local offset and mission of each mission label)
+    def GetLabelIndex(self):
+        return {label: (mission_name, local_offset) for mission_name, labels in self.mission_labels.items() for label, local_offset in labels.items()}
+
+# Analyzer collecting the instructions and labels of each mission from the shared scan for their control flow graphs
+@RegisterScmAnalyzer
+class ScmControlFlowAnalyzer(ScmAnalyzer):
+    name = "control_flow"
+    all_instructions = True
+    events = (RECORD_NAME, RECORD_LABEL)
+
+    def __init__(self, file_path):
+        super().__init__(file_path)
+
+        # Dictionaries to store the instructions and the labels of each mission
+        self.mission_instructions = {}
+        self.mission_labels = {}
+
+        # List to store the labels waiting for their instruction line
+        self.pending_labels = []
+
+    # Function to add a mission when its name is found, and store the labels until their instruction line
+    def OnEvent(self, kind, line_number, line_position, value):
+        if kind == RECORD_NAME:
+            self.mission_instructions.setdefault(value, [])
+            self.mission_labels.setdefault(value, {})
+        else:
+            self.pending_labels.append(value)
+
+    # Function to add an instruction of a mission and give its local offset to the labels before it (the main part of the script has no local offsets)
+    def OnInstruction(self, record, mission_name):
+        offsets = record[3]
+        if len(offsets) == 2 and mission_name in self.mission_instructions:
+            labels = self.mission_labels[mission_name]
+            for label in self.pending_labels:
+                labels[label] = offsets[1]
+            self.mission_instructions[mission_name].append((offsets[1], record[4], record[5]))
+        self.pending_labels = []
+
+    # Function to return the control flow of the missions (each graph is built on its first request)
+    def Finish(self, results):
+        return ScmControlFlow(self.mission_instructions, self.mission_labels)
+
+    # Function to save the control flow report
+    def Write(self, output_dir, compress=False):
+        output_path = os.path.join(output_dir, "Control_Flow", "control_flow_output.txt")
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        return SaveControlFlowToFile(output_path, self.result, compress)
+
+# Function to get the control flow of the missions of a decompiled GTA SCM file from a single scan
+def LoadScmControlFlow(file_path):
+    return RunScmAnalyzers(file_path, [ScmControlFlowAnalyzer(file_path)])["control_flow"]
+
+# Function to format the control flow of the missions section by section (gosub targets with their stack effects, and the instructions run after each wait)
+def FormatControlFlowSections(control_flow):
+    # Iterates through the missions in file order
+    for mission_name in control_flow.GetMissionNames():
+        graph = control_flow.GetMissionGraph(mission_name)
+        gosub_targets = graph.GetGosubTargets()
+        yield f"Mission: {mission_name} ({len(graph)} instructions, {len(graph.labels)} labels, {len(gosub_targets)} gosub targets, {len(graph.unresolved_jumps)} jumps out of the mission)\n"
+
+        yield "\n"
+
+        # Writes the gosub targets
+        if gosub_targets:
+            yield "  {:<30}{:<15}{:<10}{:<10}{:<15}{:<40}\n".format("Gosub Target", "Local Offset", "Depth", "Returns", "Instructions", "Callers (Local Offsets)")
+            yield "  " + "=" * 120 + "\n"
+            for gosub_target in gosub_targets:
+                yield "  {:<30}{:<15}{:<10}{:<10}{:<15}{:<40}\n".format(
+                    gosub_target["label"] or "-", # Label of the target
+                    gosub_target["local_offset"], # Local offset of the target
+                    "recursive" if gosub_target["depth"] is None else gosub_target["depth"], # Gosub stack depth
+                    "yes" if gosub_target["returns"] else "no", # Checks if it returns
+                    gosub_target["instructions"], # Instructions of the body
+                    ", ".join(str(caller) for caller in gosub_target["callers"]) # Local offsets of the gosubs
+                )
+
+            yield "\n"
+
+        # Writes the instructions run between each wait and the next waits
+        waits = [position for position in range(len(graph)) if graph.IsWait(position)]
+        if waits:
+            yield "  {:<30}{:<15}{:<40}\n".format("Wait (Local Offset)", "Instructions", "Next Waits (Local Offsets)")
+            yield "  " + "=" * 85 + "\n"
+            for position in waits:
+                executed, next_waits = graph.GetInstructionsBetweenWaits(position)
+                yield "  {:<30}{:<15}{:<40}\n".format(graph.local_offsets[position], len(executed), ", ".join(str(offset) for offset in sorted(graph.local_offsets[wait] for wait in next_waits)) or "-")
+
+            yield "\n"
+
+# Function to save the control flow of the missions to a file (gzip compressed when requested), returning the written file path
+def SaveControlFlowToFile(output_path, control_flow, compress=False):
+    with OpenReportFile(output_path, compress) as file:
+        WriteInChunks(file, FormatControlFlowSections(control_flow))
+
+    # Returns the written file path
+    return GetReportPath(output_path, compress)
+
+# Function to build the control flow graphs of the missions of a decompiled SCM file and save their report
+def RunControlFlow(file_path, output_root, compress=False):
+    PrintMessage("Building the control flow graphs of the missions...", "yellow")
+
+    PrintMessage()
+
+    # Scans the SCM file, builds the graphs and saves the report
+    start_time = time.perf_counter()
+    analyzer = ScmControlFlowAnalyzer(file_path)
+    RunScmAnalyzers(file_path, [analyzer])
+    control_flow = analyzer.result
+    saved_file_control_flow = analyzer.Write(output_root, compress)
+
+    PrintMessage(f"{len(control_flow.graphs)} missions, {sum(len(graph.labels) for graph in control_flow.graphs.values())} labels, {sum(len(graph.calls) for graph in control_flow.graphs.values())} gosubs in {time.perf_counter() - start_time:.2f} seconds.", "cyan")
+
+    PrintMessage()
+
+    PrintMessage(f"Control flow saved to: {saved_file_control_flow}", "green")
+
+    # Returns the control flow graphs
+    return control_flow
+
+# Function to read the lines of a decompiled SCM file at many byte offsets with a single open (without their leading and trailing whitespaces)
+def ReadScmLines(file_path, line_positions):
+    # List to store the lines
+    lines = []
+
+    # Opens the SCM file in binary mode and reads the line at each byte offset
+    with open(file_path, "rb") as file:
+        for line_position in line_positions:
+            file.seek(line_position)
+            lines.append(file.readline().decode("utf-8").strip())
+
+    # Returns the lines
+    return lines
+
+# Analyzer listing the instructions of its opcodes by mission (subclasses only set their name, opcodes and report title)
+class ScmOpcodeLinesAnalyzer(ScmAnalyzer):
+    title = None # Title of the report
+
+    def __init__(self, file_path):
+        super().__init__(file_path)
+
+        # List to store the (mission name, offsets, line byte offset) of the instructions
+        self.instructions = []
+
+    # Function to store an instruction of the opcodes
+    def OnInstruction(self, record, mission_name):
+        self.instructions.append((mission_name, record[3], record[2]))
+
+    # Function to return the instructions with their line text
+    def Finish(self, results):
+        return [(mission_name, offsets, line) for (mission_name, offsets, _), line in zip(self.instructions, ReadScmLines(self.file_path, [line_position for _, _, line_position in self.instructions]))]
+
+    # Function to save the instructions report to the analyzers directory
+    def Write(self, output_dir, compress=False):
+        output_path = os.path.join(output_dir, "Analyzers", f"{self.name}_output.txt")
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with OpenReportFile(output_path, compress) as file:
+            WriteInChunks(file, self.FormatReport())
+
+        # Returns the written file path
+        return GetReportPath(output_path, compress)
+
+    # Function to format the instructions report (title, headers, one row per instruction and the count of each mission)
+    def FormatReport(self):
+        yield f"{self.title} ({', '.join(f'{opcode:04X}' for opcode in self.opcodes)}): {len(self.result)} instructions\n\n"
+
+        # Writes the headers
+        yield "{:<40}{:<15}{:<15}{}\n".format("Mission Name", "Global Offset", "Local Offset", "Instruction")
+
+        # Adds a separator line below the headers
+        yield "=" * 120 + "\n"
+
+        # Writes a row for each instruction (the main part of the script has no local offsets)
+        counts = {}
+        for mission_name, offsets, line in self.result:
+            counts[mission_name] = counts.get(mission_name, 0) + 1
+            yield "{:<40}{:<15}{:<15}{}\n".format(mission_name, offsets[0], offsets[1] if len(offsets) == 2 else "-", line.split(": ", 1)[-1])
+
+        yield "\n"
+
+        # Writes the count of instructions of each mission
+        yield "{:<40}{:<15}\n".format("Mission Name", "Instructions")
+        yield "=" * 55 + "\n"
+        for mission_name, count in counts.items():
+            yield "{:<40}{:<15}\n".format(mission_name, count)
+
+# Example analyzer listing the texts printed by each mission
+@RegisterScmAnalyzer
+class ScmPrintNowAnalyzer(ScmOpcodeLinesAnalyzer):
+    name = "print_now"
+    title = "Texts printed with print_now"
+    opcodes = (0x00BC,)
+
+# Example analyzer listing the markers disabled by each mission
+@RegisterScmAnalyzer
+class ScmDisableMarkerAnalyzer(ScmOpcodeLinesAnalyzer):
+    name = "disable_marker"
+    title = "Markers disabled with disable_marker"
+    opcodes = (0x0164,)
+
+# Example analyzer listing the onscreen timers started, paused and stopped by each mission
+@RegisterScmAnalyzer
+class ScmTimersAnalyzer(ScmOpcodeLinesAnalyzer):
+    name = "timers"
+    title = "Onscreen timers (start_timer_at, stop_timer, pause_timer)"
+    opcodes = (0x014E, 0x014F, 0x0396)
+
+# Function to load analyzer plugins (Python files whose ScmAnalyzer subclasses call RegisterScmAnalyzer, both given to them without an import)
+def LoadAnalyzerPlugins(plugin_paths):
+
+    # Runs each plugin file as its own module
+    for plugin_path in plugin_paths:
+        spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(plugin_path))[0], plugin_path)
+        module = importlib.util.module_from_spec(spec)
+        module.ScmAnalyzer = ScmAnalyzer
+        module.RegisterScmAnalyzer = RegisterScmAnalyzer
+        spec.loader.exec_module(module)
+
+# Function to run analyzers (all the registered ones by default) on a decompiled SCM file in a single scan and save the report of each one
+def RunAnalyzers(file_path, output_root, analyzer_names=None, plugin_paths=(), compress=False):
+    # Loads the plugins and checks the analyzer names
+    LoadAnalyzerPlugins(plugin_paths)
+    analyzer_names = analyzer_names or list(SCM_ANALYZERS)
+    unknown_names = [analyzer_name for analyzer_name in analyzer_names if analyzer_name not in SCM_ANALYZERS]
+    if unknown_names:
+        PrintMessage(f"Unknown analyzers: {', '.join(unknown_names)} (available: {', '.join(SCM_ANALYZERS)})", "red")
+        return None
+
+    PrintMessage(f"Running {len(analyzer_names)} analyzers in a single scan...", "yellow")
+
+    PrintMessage()
+
+    # Runs the analyzers on a single scan of the SCM file
+    start_time = time.perf_counter()
+    analyzers = [SCM_ANALYZERS[analyzer_name](file_path) for analyzer_name in analyzer_names]
+    results = RunScmAnalyzers(file_path, analyzers)
+
+    PrintMessage(f"Scan and analyzers finished in {time.perf_counter() - start_time:.2f} seconds.", "cyan")
+
+    PrintMessage()
+
+    # Saves the report of each requested analyzer
+    for analyzer in analyzers:
+        saved_file = analyzer.Write(output_root, compress)
+        if saved_file is not None:
+            PrintMessage(f"{analyzer.name} saved to: {saved_file}", "green")
+
+    # Returns the results of the analyzers
+    return results
+
+# Default port of the query server (it only listens on the local host)
+QUERY_SERVER_PORT = 8765
+
+# Class to keep the parsed data of a GTA SCM file in memory for the query server, parsing it again when the file changes
+class ScmQueryFile:
+    # Function to initialize and load the SCM file
+    def __init__(self, file_path, cache_dir=None):
+        self.file_path = file_path # SCM file path
+        self.cache_dir = cache_dir # Parse cache directory path
+        self.lock = threading.Lock() # Lock of the reloads (the queries run on many threads)
+        self.loads = 0 # Number of times the SCM file was loaded
+        self.Load()
+
+    # Function to parse the SCM file and build the lookups of the queries
+    def Load(self):
+        file_stat = os.stat(self.file_path) # Size and mtime of the loaded SCM file
+        analysis = ScmAnalysis(self.file_path, self.cache_dir)
+        instruction_index = analysis.instructions
+
+        # Dictionary to find the missions by name or by thread name (case insensitive)
+        missions = {mission_name.lower(): mission_name for mission_name in instruction_index.mission_names}
+        if not instruction_index.binary:
+            name_thread_indexes = [index for index in range(len(instruction_index)) if instruction_index.opcodes[index] == 0x03A4]
+            for index, line in zip(name_thread_indexes, ReadScmLines(self.file_path, [instruction_index.line_positions[index] for index in name_thread_indexes])):
+                thread_name = re.search(r"name_thread '?([^'\s]+)", line)
+                if thread_name:
+                    missions.setdefault(thread_name.group(1).lower(), instruction_index.GetMissionName(index))
+
+        # Dictionary to store the waits of each mission
+        waits_by_mission = {}
+        for wait in analysis.waits:
+            waits_by_mission.setdefault(wait[2], []).append(wait)
+
+        # Dictionary to store the waits by the local offset of their next instruction
+        waits_by_local_offset = {}
+        for wait in analysis.waits:
+            waits_by_local_offset.setdefault(wait[1][1], []).append(wait)
+
+        # Builds the lookups that the queries need before they are served
+        instruction_index.SortByLocalOffset()
+        analysis.trivial_dupes
+
+        # Replaces the loaded data at once (the running queries keep the old data)
+        self.data = {"file_stat": file_stat, "analysis": analysis, "missions": missions, "waits_by_mission": waits_by_mission, "waits_by_local_offset": waits_by_local_offset}
+        self.loads += 1
+
+    # Function to load the SCM file again if its mtime or its size changed since the last load
+    def Refresh(self):
+        # Checks if the SCM file changed
+        file_stat = os.stat(self.file_path)
+        if (file_stat.st_mtime_ns, file_stat.st_size) == (self.data["file_stat"].st_mtime_ns, self.data["file_stat"].st_size):
+            return False
+
+        # Loads the SCM file again (once, even if many queries see the change)
+        with self.lock:
+            if (file_stat.st_mtime_ns, file_stat.st_size) != (self.data["file_stat"].st_mtime_ns, self.data["file_stat"].st_size):
+                PrintMessage(f"Reloading {self.file_path}...", "yellow")
+                self.Load()
+        return True
+
+    # Function to get the mission name of a mission or thread name (None if it's unknown)
+    def FindMission(self, name):
+        return self.data["missions"].get(name.lower())
+
+    # Function to get the mission and the instruction at or right before a global offset
+    def QueryOwner(self, global_offset):
+        instruction_index = self.data["analysis"].instructions
+        index = bisect_right(instruction_index.global_offsets, global_offset) - 1
+
+        # Checks if the offset is before the first mission instruction (in the main part of the script)
+        if index < 0:
+            return {"global_offset": global_offset, "mission": None, "instruction": None}
+
+        # Returns the owner mission and the instruction
+        instruction = FormatInstructionForQuery(instruction_index, index, with_text=True)
+        return {"global_offset": global_offset, "mission": instruction["mission"], "instruction": instruction, "exact": instruction["global_offset"] == global_offset}
+
+    # Function to get the waits of a mission
+    def QueryWaits(self, mission_name):
+        return {"mission": mission_name, "waits": [FormatWaitForQuery(wait) for wait in self.data["waits_by_mission"].get(mission_name, [])]}
+
+    # Function to get the instructions, the waits next instructions and the trivial dupes at a local offset
+    def QueryLocalOffset(self, local_offset):
+        data = self.data
+        return {
+            "local_offset": local_offset, # Local offset
+            "instructions": [FormatInstructionForQuery(data["analysis"].instructions, index) for index in data["analysis"].instructions.FindLocalOffset(local_offset)], # Instructions at the local offset
+            "waits": [FormatWaitForQuery(wait) for wait in data["waits_by_local_offset"].get(local_offset, [])], # Waits whose next instruction is at the local offset
+            "trivial_dupes": [{"wait": FormatWaitForQuery(wait), "match": {"global_offset": match_offsets[0], "local_offset": match_offsets[1], "mission": match_mission}} for wait, (match_offsets, _, match_mission) in data["analysis"].trivial_dupes.get(local_offset, [])], # Trivial dupes cases
+        }
+
+    # Function to get the stack of a mission
+    def QueryStack(self, mission_name):
+        return {"mission": mission_name, "stack": self.data["analysis"].mission_stacks.get(mission_name)}
+
+    # Function to get the summary of the loaded SCM file
+    def QuerySummary(self):
+        analysis = self.data["analysis"]
+        return {
+            "file": self.file_path, # SCM file path
+            "loads": self.loads, # Number of times the SCM file was loaded
+            "waits_count": analysis.waits_count, # Count of waits lines
+            "waits": len(analysis.waits), # Waits with a next instruction
+            "missions": len(analysis.mission_stacks), # Missions with a stack
+            "instructions": len(analysis.instructions), # Instructions with two offsets
+            "trivial_dupes": sum(len(cases) for cases in analysis.trivial_dupes.values()), # Trivial dupes cases
+        }
+
+# Function to format an instruction of an index for a JSON response
+def FormatInstructionForQuery(instruction_index, index, with_text=False):
+    instruction = {
+        "global_offset": instruction_index.global_offsets[index], # Global offset
+        "local_offset": instruction_index.local_offsets[index], # Local offset
+        "opcode": "{:04X}".format(instruction_index.opcodes[index]), # Opcode
+        "mission": instruction_index.GetMissionName(index), # Mission name
+    }
+
+    # Adds the text of the instruction line
+    if with_text:
+        instruction["text"] = instruction_index.GetLineText(index)
+
+    # Returns the instruction
+    return instruction
+
+# Function to format a wait for a JSON response
+def FormatWaitForQuery(wait):
+    wait_offsets, next_instruction_offsets, mission_name = wait
+    return {
+        "global_offset": wait_offsets[0], # Global offset of the wait instruction
+        "local_offset": wait_offsets[1], # Local offset of the wait instruction
+        "next_global_offset": next_instruction_offsets[0], # Global offset of the next instruction
+        "next_local_offset": next_instruction_offsets[1], # Local offset of the next instruction
+        "mission": mission_name, # Mission name
+    }
+
+# Function to answer a query of the server, returning the HTTP status and the JSON response
+def AnswerScmQuery(scm_files, path, parameters):
+    # Lists the loaded SCM files
+    if path == "/files":
+        for scm_file in scm_files.values():
+            scm_file.Refresh()
+        return 200, {"files": [scm_file.QuerySummary() for scm_file in scm_files.values()]}
+
+    # Gets the SCM file of the query (by path or file name, optional when only one file is loaded)
+    file_name = parameters.get("file")
+    if file_name is None and len(scm_files) == 1:
+        scm_file = next(iter(scm_files.values()))
+    else:
+        scm_file = scm_files.get(os.path.abspath(file_name or "")) or next((scm_file for file_path, scm_file in scm_files.items() if os.path.basename(file_path) == file_name), None)
+        if scm_file is None:
+            return 404, {"error": f"Unknown SCM file: {file_name}" if file_name else "The file parameter is needed when many SCM files are loaded"}
+
+    # Loads the SCM file again if it changed
+    scm_file.Refresh()
+
+    # Answers the offset queries
+    if path in ("/owner", "/local-offset"):
+        try:
+            offset = int(parameters.get("offset", ""))
+        except ValueError:
+            return 400, {"error": "The offset parameter must be an integer"}
+        return 200, scm_file.QueryOwner(offset) if path == "/owner" else scm_file.QueryLocalOffset(offset)
+
+    # Answers the mission queries
+    if path in ("/waits", "/stack"):
+        mission_name = scm_file.FindMission(parameters.get("mission", ""))
+        if mission_name is None:
+            return 404, {"error": f"Unknown mission: {parameters.get('mission', '')}"}
+        return 200, scm_file.QueryWaits(mission_name) if path == "/waits" else scm_file.QueryStack(mission_name)
+
+    # Returns an error for the unknown queries
+    return 404, {"error": f"Unknown query: {path}", "queries": ["/files", "/owner?offset=", "/waits?mission=", "/local-offset?offset=", "/stack?mission="]}
+
+# Function to create the HTTP server of the queries (http.server is only imported by the server mode)
+def CreateScmQueryServer(scm_files, host, port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qsl, urlsplit
+
+    # Class to handle the HTTP requests of the queries
+    class ScmQueryHandler(BaseHTTPRequestHandler):
+        # Function to answer a GET request with a JSON response
+        def do_GET(self):
+            url = urlsplit(self.path)
+            try:
+                status, response = AnswerScmQuery(scm_files, url.path.rstrip("/") or "/", dict(parse_qsl(url.query)))
+            except Exception as error:
+                status, response = 500, {"error": f"{type(error).__name__}: {error}"} # The SCM file can't be read or parsed anymore (the last loaded data is kept)
+
+            # Writes the JSON response
+            body = json.dumps(response).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        # Function to log the requests only in full verbosity
+        def log_message(self, format, *arguments):
+            PrintMessage(format % arguments, level=VERBOSITY_FULL)
+
+    # Returns the HTTP server
+    return ThreadingHTTPServer((host, port), ScmQueryHandler)
+
+# Function to parse SCM files once and answer queries about them over HTTP on the local host until it's stopped
+def RunServer(file_paths, host="127.0.0.1", port=QUERY_SERVER_PORT):
+    PrintMessage(f"Loading {len(file_paths)} SCM files...", "yellow")
+
+    PrintMessage()
+
+    # Loads the SCM files
+    scm_files = {os.path.abspath(file_path): ScmQueryFile(file_path, scm_cache_dir) for file_path in file_paths}
+
+    # Starts the HTTP server
+    server = CreateScmQueryServer(scm_files, host, port)
+    PrintMessage(f"Answering queries at http://{host}:{server.server_address[1]}/ (press Ctrl+C to stop)", "green")
+
+    # Serves the queries until the server is stopped
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    PrintMessage()
+
+    PrintMessage("Server stopped.", "green")
+
+""" Main Program """
+
+# Function to run the script on the GTA III (Original) SCM file, printing the results
+def RunSingleFile(parse_workers=None, compress=False):
+    # Creates the output directories
+    CreateOutputDirectories()
+
+    PrintMessage("Starting the script...", "cyan")
+
+    PrintMessage()
+
+    PrintMessage("Processing GTA III (Original) SCM file...", "yellow")
+
+    PrintMessage()
+
+    PrintMessage("Getting all the waits offsets and the next instruction of the wait offsets from the GTA III (Original) SCM file...", "yellow")
+
+    PrintMessage()
+
+    # Calls the function to load from the parse cache (or to scan the SCM file once and collect) the waits count (lines with '} 0001: wait'), the waits offsets (globals and locals) with the next instruction of the wait offsets (globals and locals), the mission stacks and the instruction index
+    missions_waits_count, waitsoffsets, mission_stacks, instruction_index = LoadScmData(input_file_path, scm_cache_dir, parse_workers=parse_workers)
+
+    PrintMessage("Getting all the mission stacks from the GTA III (Original) SCM file...", "yellow")
+
+    PrintMessage()
+
+    PrintMessage("Getting all the Trivial Dupes from the GTA III (Original) SCM file...", "yellow")
+
+    PrintMessage()
+
+    # Calls the function to find and group the matching local offsets from the GTA SCM file
+    matching_offsets = FindMatchingLocalOffsets(waitsoffsets, instruction_index)
+
+    # Prints the results (calling the function)
+    PrintResults(waitsoffsets, missions_waits_count, matching_offsets, mission_stacks)
+
+    # Prints total missions_waits_count (optional)
+    PrintMessage(f"Total Missions Waits Count: {missions_waits_count}\n")
+
+    # Calls the function to save the mission waits data to a file
+    saved_file_missions_waits = SaveMissionWaitsDataToFile(output_file_missions_waits, waitsoffsets, missions_waits_count, compress)
+
+    # Calls the function to save the mission stacks data to a file
+    saved_file_missions_compatibilities = SaveMissionStacksToFile(output_file_missions_compatibilities, mission_stacks, compress)
+
+    # Calls the function to save the trivial dupes data to a file
+    saved_file_trivial_dupes = SaveTrivialDupesDataToFile(output_file_trivial_dupes, matching_offsets, mission_stacks, compress)
+
+    # Prints where the output file of the mission waits was saved
+    PrintMessage(f"Missions waits saved to: {saved_file_missions_waits}", "green")
+
+    PrintMessage()
+
+    # Prints where the output file of the missions compatibilities was saved
+    PrintMessage(f"Missions compatibilities saved to: {saved_file_missions_compatibilities}", "green")
+
+    PrintMessage()
+
+    # Prints where the output file of the trivial dupes was saved
+    PrintMessage(f"Trivial dupes saved to: {saved_file_trivial_dupes}", "green")
+
+    PrintMessage()
+
+    # Prints that the execution was completed
+    PrintMessage("Execution completed!", "green")
+
+    PrintMessage()
+
+    # Waits for a key press only when the script runs in an interactive console
+    if console_verbosity > VERBOSITY_SILENT and sys.stdin.isatty():
+        input("Press any key to continue...")
+
+# Function to parse the command line arguments
+def ParseArguments():
+    import argparse
+    parser = argparse.ArgumentParser(description="Gets missions data (waits, stacks and trivial dupes) from decompiled GTA 3D era SCM files.")
+    parser.add_argument("--batch", nargs="+", metavar="PATH", help="directories or glob patterns of decompiled SCM text files to process in parallel")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes of the batch mode (default: number of CPUs)")
+    parser.add_argument("--parse-workers", type=int, default=None, help="number of worker processes parsing the missions of the SCM file in parallel (single file mode)")
+    parser.add_argument("--incremental", nargs="?", const=input_file_path, metavar="SCM_TEXT", help="analyse a decompiled SCM file (default: the GTA III one) parsing and matching again only its changed mission blocks")
+    parser.add_argument("--binary", metavar="MAIN_SCM", help="compiled main.scm file to decode directly, without a decompiled text (needs --opcodes)")
+    parser.add_argument("--opcodes", metavar="SCM_INI", help="Sanny Builder SCM.INI file with the opcodes parameters of the game of --binary")
+    parser.add_argument("--game", choices=sorted(SCM_GAMES), default="gta3", help="game of --binary (default: gta3)")
+    parser.add_argument("--mission-names", metavar="FILE", help="text file with the mission names of --binary, one per line in mission order")
+    parser.add_argument("--oracle", metavar="TEXT", help="decompiled text of --binary to compare the decoded data against")
+    parser.add_argument("--verbosity", choices=list(VERBOSITY_LEVELS), default="full", help="console output: nothing, only the progress and summaries, or every wait and trivial dupe (default: full)")
+    parser.add_argument("--compress", action="store_true", help="save the reports gzip compressed (.gz)")
+    parser.add_argument("--profile", action="store_true", help="time each stage of the single file mode with its memory and counts, and save a JSON profile report next to the reports")
+    parser.add_argument("--profile-dump", action="store_true", help="with --profile, also dump the cProfile statistics of the slowest stage")
+    parser.add_argument("--profile-no-memory", action="store_true", help="with --profile, skip the tracemalloc memory measures (they slow down the stages that allocate the most)")
+    parser.add_argument("--analyze", nargs="?", const=input_file_path, metavar="SCM_TEXT", help="run analyzers on a decompiled SCM file (default: the GTA III one) in a single scan and save the report of each one")
+    parser.add_argument("--analyzers", type=lambda value: [name.strip() for name in value.split(",") if name.strip()], metavar="NAMES", help="comma separated analyzers of --analyze (default: all the registered ones, for example waits,stacks,trivial_dupes,print_now,disable_marker,timers)")
+    parser.add_argument("--analyzer-plugin", action="append", default=[], metavar="FILE", help="Python file registering more analyzers for --analyze (can be repeated)")
+    parser.add_argument("--control-flow", nargs="?", const=input_file_path, metavar="SCM_TEXT", help="build the control flow graph of each mission of a decompiled SCM file (default: the GTA III one) and save its gosub targets and waits reachability")
+    parser.add_argument("--diff", nargs=2, metavar=("OLD_SCM_TEXT", "NEW_SCM_TEXT"), help="compare the waits, stacks and trivial dupes of two versions of a decompiled SCM file")
+    parser.add_argument("--serve", nargs="+", metavar="SCM_TEXT", help="parse decompiled SCM files once and answer JSON queries about them over HTTP on the local host (reloading a file when it changes)")
+    parser.add_argument("--port", type=int, default=QUERY_SERVER_PORT, help=f"port of the --serve mode (default: {QUERY_SERVER_PORT})")
+    parser.add_argument("--output-dir", default=os.path.join(PROJECT_ROOT, "output"), help="output directory of the batch, binary (one subdirectory per SCM file), incremental, diff, control flow and analyzers modes")
+    arguments = parser.parse_args()
+
+    # Checks that the binary mode has its opcodes table
+    if arguments.binary and not arguments.opcodes:
+        parser.error("--binary needs --opcodes")
+
+    # Checks that the profile mode runs on the single file mode
+    if arguments.profile and (arguments.batch or arguments.binary or arguments.incremental or arguments.serve or arguments.diff or arguments.control_flow or arguments.analyze):
+        parser.error("--profile only works in the single file mode")
+    if (arguments.profile_dump or arguments.profile_no_memory) and not arguments.profile:
+        parser.error("--profile-dump and --profile-no-memory need --profile")
+
+    # Returns the arguments
+    return arguments
+
+# Runs the batch mode when requested, else the single file mode
+if __name__ == "__main__":
+    arguments = ParseArguments()
+    SetVerbosity(VERBOSITY_LEVELS[arguments.verbosity])
+
+    if arguments.analyze:
+        RunAnalyzers(arguments.analyze, arguments.output_dir, arguments.analyzers, arguments.analyzer_plugin, arguments.compress)
+    elif arguments.control_flow:
+        RunControlFlow(arguments.control_flow, arguments.output_dir, arguments.compress)
+    elif arguments.diff:
+        RunDiff(arguments.diff[0], arguments.diff[1], arguments.output_dir, arguments.compress)
+    elif arguments.serve:
+        RunServer(arguments.serve, port=arguments.port)
+    elif arguments.incremental:
+        RunIncremental(arguments.incremental, arguments.output_dir, arguments.compress)
+    elif arguments.binary:
+        RunBinary(arguments.binary, arguments.opcodes, arguments.output_dir, arguments.game, arguments.mission_names, arguments.oracle, arguments.compress)
+    elif arguments.batch:
+        RunBatch(arguments.batch, arguments.output_dir, arguments.workers, arguments.compress)
+    elif arguments.profile:
+        RunProfile(input_file_path, arguments.compress, arguments.profile_dump, not arguments.profile_no_memory)
+    else:
+        RunSingleFile(arguments.parse_workers, arguments.compress)
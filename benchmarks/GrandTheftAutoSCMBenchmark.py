@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Gets the absolute paths of the benchmarks directory and of the project root
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCHMARKS_DIR)
+
+# Imports the script to benchmark from the project root
+sys.path.insert(0, PROJECT_ROOT)
+import GrandTheftAutoSCMMissionsDataCollector as collector
+
+# Benchmark files paths
+baseline_file_path = os.path.join(BENCHMARKS_DIR, "benchmark_baseline.json") # Stored baseline results path
+results_dir = os.path.join(BENCHMARKS_DIR, "results") # Results of every run directory path
+
+# Size of the synthetic GTA III SCM file at scale 1 (about the size of the original decompiled main.scm)
+SYNTHETIC_MISSIONS = 80 # Mission blocks (the same count at every scale, so the trivial dupes grow linearly with the missions sizes)
+SYNTHETIC_MAIN_INSTRUCTIONS = 13000 # Instructions of the main part of the script at scale 1
+SYNTHETIC_MISSION_INSTRUCTIONS = 850 # Average instructions of a mission at scale 1
+SYNTHETIC_DEFINE_LINES = 250 # Object definition lines (with a single offset) at the start of the file
+
+# Instructions of the synthetic SCM (opcode, text and size in bytes), like the most common GTA III instructions
+SYNTHETIC_INSTRUCTIONS = [
+    ("0004", "$ONMISSION = 1", 7),
+    ("0006", "16@ = 0", 7),
+    ("00D6", "if", 4),
+    ("0038", "$FLAG_INFO == 0", 7),
+    ("001A", "8 > $FLAG_INFO", 7),
+    ("8248", "not model #AMBULAN available", 4),
+    ("0247", "request_model #MEDIC", 4),
+    ("01B4", "set_player $PLAYER_CHAR controllable 0", 7),
+    ("0173", "set_actor $WASTED_HELP_MEDIC z_angle_to 25.0", 8),
+    ("00A5", "$WASTED_HELP_AMBULANCE = create_car #AMBULAN at 1140.188 -621.5 14.75", 16),
+    ("015F", "set_camera_position 1138.563 -600.0 18.0 rotation 0.0 0.0 0.0", 20),
+    ("039D", "scatter_particles type 10 1.0 0 0 0 6000 from 791.625 -936.875 38.3125 to 0.0 0.0 0.0", 34),
+]
+
+# Stages of the benchmark, in run order
+BENCHMARK_STAGES = [
+    "parse", # Single scan of the SCM file (CollectScmData: the waits count, the waits, the mission stacks and the instruction index at once)
+    "cache_store", # Parse and save to an empty parse cache (LoadScmData)
+    "cache_load", # Load from the parse cache (LoadScmData, what MissionsWaitsCounter, GetWaitsLines, GetMissionStacks and GetAllLines read)
+    "find_matching_local_offsets", # FindMatchingLocalOffsets
+    "save_mission_waits", # SaveMissionWaitsDataToFile
+    "save_mission_stacks", # SaveMissionStacksToFile
+    "save_trivial_dupes", # SaveTrivialDupesDataToFile
+]
+
+""" Functions """
+
+# Function to write the instructions of a synthetic block, with labels and waits like a decompiled SCM
+def WriteSyntheticInstructions(file, rng, global_offset, local_offset, instructions_count, label_prefix, local_offsets=True):
+    # Variables to store the lines of the block (written in large blocks)
+    lines = []
+
+    # Iterates through the instructions of the block
+    for number in range(instructions_count):
+        # Adds a label before some instructions (a blank line and the label line, like the decompiled text)
+        if number and rng.random() < 0.12:
+            lines.append(f"\n:{label_prefix}_{local_offset}\n")
+
+        # Picks a wait (about as often as in GTA III), else a common instruction
+        if rng.random() < 0.025:
+            opcode, text, size = "0001", f"wait {rng.choice((0, 0, 0, 250, 1000))} ms", 4
+        else:
+            opcode, text, size = rng.choice(SYNTHETIC_INSTRUCTIONS)
+
+        # Adds the instruction line (the main part has only global offsets)
+        if local_offsets:
+            lines.append(f"{{{global_offset} {local_offset}}} {opcode}: {text}\n")
+        else:
+            lines.append(f"{{{global_offset}}} {opcode}: {text}\n")
+        global_offset += size
+        local_offset += size
+
+        # Writes the lines in large blocks
+        if len(lines) >= 10000:
+            file.write("".join(lines))
+            lines = []
+
+    # Writes the remaining lines
+    file.write("".join(lines))
+
+    # Returns the offsets after the block
+    return global_offset, local_offset
+
+# Function to generate a synthetic decompiled GTA III SCM file of a given scale (1 is about the size of the original one)
+def GenerateSyntheticScmFile(output_path, scale, seed=0):
+    # Random generator with a fixed seed, so every run benchmarks the same file
+    rng = random.Random(seed)
+
+    # Opens the output file in write mode
+    with open(output_path, "w", newline="\n") as file:
+        # Writes the object definitions (lines with a single offset)
+        global_offset = 17260
+        file.write(f"{{{global_offset}}} DEFINE OBJECTS {SYNTHETIC_DEFINE_LINES}\n")
+        for number in range(SYNTHETIC_DEFINE_LINES):
+            global_offset += 24
+            file.write(f"{{{global_offset}}} DEFINE OBJECT OBJECT{number} // Object number -{number + 1}\n")
+
+        # Writes the main part of the script
+        file.write("\n//-------------MAIN---------------\n")
+        global_offset, _ = WriteSyntheticInstructions(file, rng, global_offset, global_offset, SYNTHETIC_MAIN_INSTRUCTIONS * scale, "MAIN", local_offsets=False)
+        file.write(f"{{{global_offset}}} 0051: return\n")
+        global_offset += 2
+
+        # Writes the mission blocks
+        for mission_number in range(SYNTHETIC_MISSIONS):
+            label = f"SYN{mission_number}"
+
+            # Writes the mission block header and the mission name
+            file.write(f"\n//-------------Mission {mission_number}---------------\n")
+            file.write(f"// Originally: Synthetic Mission {mission_number}\n")
+
+            # Writes the first gosub of the mission (its next instruction local offset is the mission stack)
+            file.write(f"\n:{label}\n")
+            global_offset, local_offset = WriteSyntheticInstructions(file, rng, global_offset, 0, rng.randint(0, 3), label)
+            file.write(f"{{{global_offset} {local_offset}}} 0050: gosub @{label}_START\n")
+            global_offset += 7
+            local_offset += 7
+            file.write(f"{{{global_offset} {local_offset}}} 004E: end_thread\n")
+            global_offset += 2
+            local_offset += 2
+
+            # Writes the body of the mission (its size varies around the average)
+            file.write(f"\n:{label}_START\n")
+            file.write(f"{{{global_offset} {local_offset}}} 03A4: name_thread '{label}'\n")
+            global_offset += 10
+            local_offset += 10
+            instructions_count = int(SYNTHETIC_MISSION_INSTRUCTIONS * scale * rng.uniform(0.3, 1.7))
+            global_offset, local_offset = WriteSyntheticInstructions(file, rng, global_offset, local_offset, instructions_count, label)
+            file.write(f"{{{global_offset} {local_offset}}} 004E: end_thread\n")
+            global_offset += 2
+
+    # Returns the size of the synthetic file
+    return os.path.getsize(output_path)
+
+# Function to run a stage, returning its result and its time in seconds
+def TimeStage(stage_function):
+    start_time = time.perf_counter()
+    result = stage_function()
+    return result, time.perf_counter() - start_time
+
+# Function to run a stage with the memory tracing on, returning its result and its peak of allocated memory in bytes
+def TraceStageMemory(stage_function):
+    tracemalloc.start()
+    try:
+        result = stage_function()
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, peak_memory
+
+# Function to get the stages functions of the benchmark of a SCM file (each one gets the results of the stages before it)
+def GetBenchmarkStages(scm_path, work_dir):
+    # Dictionary to store the results of the stages, used by the next stages
+    results = {}
+
+    # Output files paths of the writers
+    output_path_missions_waits = os.path.join(work_dir, "mission_waits_output.txt")
+    output_path_missions_compatibilities = os.path.join(work_dir, "missions_compatibilities_output.txt")
+    output_path_trivial_dupes = os.path.join(work_dir, "trivial_dupes_output.txt")
+
+    # Function to parse the SCM file and save it to an empty parse cache
+    def CacheStore():
+        shutil.rmtree(collector.scm_cache_dir, ignore_errors=True)
+        return collector.LoadScmData(scm_path, collector.scm_cache_dir)
+
+    # Returns the stages functions
+    return results, {
+        "parse": lambda: collector.CollectScmData(scm_path),
+        "cache_store": CacheStore,
+        "cache_load": lambda: collector.LoadScmData(scm_path, collector.scm_cache_dir),
+        "find_matching_local_offsets": lambda: collector.FindMatchingLocalOffsets(results["parse"][1], results["parse"][3]),
+        "save_mission_waits": lambda: collector.SaveMissionWaitsDataToFile(output_path_missions_waits, results["parse"][1], results["parse"][0]),
+        "save_mission_stacks": lambda: collector.SaveMissionStacksToFile(output_path_missions_compatibilities, results["parse"][2]),
+        "save_trivial_dupes": lambda: collector.SaveTrivialDupesDataToFile(output_path_trivial_dupes, results["find_matching_local_offsets"], results["parse"][2]),
+    }
+
+# Function to benchmark every stage on a synthetic SCM file of a given scale
+def BenchmarkScale(scale, work_dir, repeat=3, trace_memory=True, seed=0):
+    # Generates the synthetic SCM file
+    scm_path = os.path.join(work_dir, f"synthetic_scm_{scale}x.txt")
+    start_time = time.perf_counter()
+    file_size = GenerateSyntheticScmFile(scm_path, scale, seed)
+    print(f"Generated the {scale}x synthetic SCM file ({file_size / (1 << 20):.1f} MB) in {time.perf_counter() - start_time:.2f} s")
+
+    # Uses a parse cache of the work directory (the stages read from it like the script does)
+    collector.scm_cache_dir = os.path.join(work_dir, "cache")
+
+    # Dictionary to store the results of the scale
+    scale_results = {"file_size": file_size, "stages": {}}
+
+    # Times each stage (the fastest of the repeats)
+    results, stages = GetBenchmarkStages(scm_path, work_dir)
+    for stage in BENCHMARK_STAGES:
+        seconds = []
+        for _ in range(repeat):
+            results[stage], stage_seconds = TimeStage(stages[stage])
+            seconds.append(stage_seconds)
+        scale_results["stages"][stage] = {"seconds": min(seconds)}
+
+        # Measures the peak memory of the stage in a separate run (the memory tracing slows it down)
+        if trace_memory:
+            results[stage], scale_results["stages"][stage]["peak_memory"] = TraceStageMemory(stages[stage])
+
+        print(f"  {stage:<30}{min(seconds):>10.3f} s" + (f"{scale_results['stages'][stage]['peak_memory'] / (1 << 20):>12.1f} MB" if trace_memory else ""))
+
+    # Adds the sizes of the data (to tell a slower stage from a bigger output)
+    scale_results["waits"] = len(results["parse"][1])
+    scale_results["instructions"] = len(results["parse"][3])
+    scale_results["trivial_dupes"] = sum(len(cases) for cases in results["find_matching_local_offsets"].values())
+    scale_results["output_size"] = sum(os.path.getsize(results[stage]) for stage in ("save_mission_waits", "save_mission_stacks", "save_trivial_dupes"))
+
+    # Removes the synthetic file and the outputs of the scale
+    results.clear()
+    for file_name in os.listdir(work_dir):
+        path = os.path.join(work_dir, file_name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+
+    # Returns the results of the scale
+    return scale_results
+
+# Function to compare benchmark results against a baseline, returning the regressions past the thresholds
+def FindRegressions(results, baseline, time_threshold, memory_threshold, min_seconds=0.05, min_bytes=1 << 20):
+    # List to store the regressions
+    regressions = []
+
+    # Iterates through the stages benchmarked in both runs
+    for scale, scale_results in results["scales"].items():
+        baseline_scale = baseline.get("scales", {}).get(scale)
+        if baseline_scale is None:
+            continue
+
+        for stage, stage_results in scale_results["stages"].items():
+            baseline_stage = baseline_scale["stages"].get(stage)
+            if baseline_stage is None:
+                continue
+
+            # Checks the time (stages faster than the minimum are only noise)
+            seconds, baseline_seconds = stage_results["seconds"], baseline_stage["seconds"]
+            if seconds > baseline_seconds * time_threshold and seconds - baseline_seconds > min_seconds:
+                regressions.append(f"{scale}x {stage}: {seconds:.3f} s vs {baseline_seconds:.3f} s ({seconds / max(baseline_seconds, 1e-9):.2f}x)")
+
+            # Checks the peak memory (growths smaller than the minimum are only allocator noise)
+            if "peak_memory" in stage_results and baseline_stage.get("peak_memory"):
+                peak_memory, baseline_peak_memory = stage_results["peak_memory"], baseline_stage["peak_memory"]
+                if peak_memory > baseline_peak_memory * memory_threshold and peak_memory - baseline_peak_memory > min_bytes:
+                    regressions.append(f"{scale}x {stage}: {peak_memory / (1 << 20):.1f} MB vs {baseline_peak_memory / (1 << 20):.1f} MB peak memory ({peak_memory / baseline_peak_memory:.2f}x)")
+
+    # Returns the regressions
+    return regressions
+
+# Function to save benchmark results to a JSON file
+def SaveResults(output_path, results):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w") as file:
+        json.dump(results, file, indent=4)
+        file.write("\n")
+
+""" Main Program """
+
+# Function to parse the command line arguments
+def ParseArguments():
+    parser = argparse.ArgumentParser(description="Benchmarks the stages of the SCM missions data collector on synthetic decompiled GTA III SCM files.")
+    parser.add_argument("--scales", default="1,10,100", help="comma separated sizes of the synthetic SCM files, in GTA III sizes (default: 1,10,100)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each stage, the fastest one is kept (default: 3)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory runs (they trace every allocation)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic SCM files (default: 0)")
+    parser.add_argument("--output", help="JSON results file path (default: a timestamped file of benchmarks/results)")
+    parser.add_argument("--baseline", default=baseline_file_path, help="baseline JSON results to check for regressions (default: benchmarks/benchmark_baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline instead of checking them")
+    parser.add_argument("--time-threshold", type=float, default=1.25, help="slowdown ratio of a stage that fails the benchmark (default: 1.25)")
+    parser.add_argument("--memory-threshold", type=float, default=1.25, help="peak memory ratio of a stage that fails the benchmark (default: 1.25)")
+    return parser.parse_args()
+
+# Function to run the benchmark and check it against the baseline, returning the exit code
+def RunBenchmark(arguments):
+    # The script under benchmark prints nothing
+    collector.SetVerbosity(collector.VERBOSITY_SILENT)
+
+    # Dictionary to store the results of the run
+    results = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"), # Run date
+        "python": platform.python_version(), # Python version
+        "platform": platform.platform(), # Operating system
+        "repeat": arguments.repeat, # Runs of each stage
+        "seed": arguments.seed, # Seed of the synthetic files
+        "scales": {},
+    }
+
+    # Benchmarks each scale in a temporary work directory
+    with tempfile.TemporaryDirectory(prefix="scm_benchmark_") as work_dir:
+        for scale in (int(scale) for scale in arguments.scales.split(",")):
+            results["scales"][str(scale)] = BenchmarkScale(scale, work_dir, arguments.repeat, not arguments.no_memory, arguments.seed)
+
+    # Saves the results
+    output_path = arguments.output or os.path.join(results_dir, time.strftime("benchmark_%Y%m%d_%H%M%S.json"))
+    SaveResults(output_path, results)
+    print(f"Benchmark results saved to: {output_path}")
+
+    # Stores the results as the new baseline when requested
+    if arguments.save_baseline:
+        SaveResults(arguments.baseline, results)
+        print(f"Baseline saved to: {arguments.baseline}")
+        return 0
+
+    # Checks the results against the baseline
+    if not os.path.exists(arguments.baseline):
+        print(f"No baseline at {arguments.baseline} (store one with --save-baseline).")
+        return 1
+    with open(arguments.baseline, "r") as file:
+        baseline = json.load(file)
+    regressions = FindRegressions(results, baseline, arguments.time_threshold, arguments.memory_threshold)
+
+    # Prints the regressions
+    if regressions:
+        print("Regressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print("No regressions against the baseline.")
+    return 0
+
+# Runs the benchmark
+if __name__ == "__main__":
+    sys.exit(RunBenchmark(ParseArguments()))
@@ -0,0 +1,43 @@
+import os
+
+from GrandTheftAutoSCMMissionsDataCollector import CollectBinaryScmData, CollectScmData, CompareScmData, DecodeBinaryScmInstructions, LoadMissionNames, LoadOpcodeTable, ReadBinaryScmHeader
+
+# Small synthetic GTA III main.scm (two missions with waits, gosubs and jumps), its decompiled text oracle, opcodes table and mission names
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "binary")
+SCM_PATH = os.path.join(FIXTURES_DIR, "main.scm")
+TEXT_PATH = os.path.join(FIXTURES_DIR, "main.txt")
+OPCODES_PATH = os.path.join(FIXTURES_DIR, "SCM.INI")
+NAMES_PATH = os.path.join(FIXTURES_DIR, "names.txt")
+
+# Function to check that the header of the compiled SCM is read through its segment jumps
+def test_read_header():
+    with open(SCM_PATH, "rb") as file:
+        header = ReadBinaryScmHeader(file.read())
+
+    assert header["main_script"] == 56
+    assert header["mission_offsets"] == [70, 142]
+
+# Function to check that the instructions of a mission are decoded with their label targets (negative targets are local to the mission)
+def test_decode_instructions():
+    with open(SCM_PATH, "rb") as file:
+        scm_buffer = file.read()
+    instructions = DecodeBinaryScmInstructions(scm_buffer, 70, 142, LoadOpcodeTable(OPCODES_PATH), 2)
+
+    assert [instruction_offset for instruction_offset, _, _ in instructions] == [70, 77, 87, 91, 101, 105, 109, 116, 123, 130, 132, 140]
+    assert instructions[0] == (70, 0x0050, [-62]) # gosub @A_sub
+    assert instructions[7] == (116, 0x004D, [-35]) # goto_if_false @A_loop
+
+# Function to check that the compiled SCM gives the same waits, stacks and instructions as its decompiled text
+def test_binary_matches_text_oracle():
+    reference_data = CollectScmData(TEXT_PATH)
+    candidate_data = CollectBinaryScmData(SCM_PATH, LoadOpcodeTable(OPCODES_PATH), "gta3", LoadMissionNames(NAMES_PATH))
+
+    assert CompareScmData(reference_data, candidate_data) == []
+    assert candidate_data[0] == 6
+    assert candidate_data[2] == {"Alpha": 7, "Beta": 21}
+
+# Function to check that the mission names fall back to the name_thread of each mission
+def test_binary_mission_names_from_name_thread():
+    candidate_data = CollectBinaryScmData(SCM_PATH, LoadOpcodeTable(OPCODES_PATH))
+
+    assert list(candidate_data[2]) == ["TESTA", "TESTB"]
@@ -0,0 +1,52 @@
+import os
+
+import GrandTheftAutoSCMMissionsDataCollector
+from GrandTheftAutoSCMMissionsDataCollector import CollectScmData, LoadScmControlFlow, ScmAnalysis
+
+# Decompiled text of the synthetic SCM fixture (two missions with waits, gosubs and a conditional jump)
+TEXT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "binary", "main.txt")
+
+# Function to get the local offsets of graph positions
+def GetLocalOffsets(graph, positions):
+    return sorted(graph.local_offsets[position] for position in positions)
+
+# Function to check that the labels of each mission are indexed to the local offset of their instruction
+def test_label_index():
+    control_flow = LoadScmControlFlow(TEXT_PATH)
+
+    assert control_flow.GetMissionNames() == ["Alpha", "Beta"]
+    assert control_flow.GetLabelIndex() == {"A": ("Alpha", 0), "A_loop": ("Alpha", 35), "A_sub": ("Alpha", 62), "B": ("Beta", 0), "B_sub": ("Beta", 37)}
+
+# Function to check the instructions that can run between a wait and the next waits (following the jumps and the gosubs)
+def test_instructions_between_waits():
+    control_flow = LoadScmControlFlow(TEXT_PATH)
+    alpha, beta = control_flow.GetMissionGraph("Alpha"), control_flow.GetMissionGraph("Beta")
+
+    executed, next_waits = alpha.GetInstructionsBetweenWaits(alpha.FindPosition(31))
+    assert GetLocalOffsets(alpha, executed) == [35, 39, 46]
+    assert GetLocalOffsets(alpha, next_waits) == [53]
+
+    executed, next_waits = beta.GetInstructionsBetweenWaits(beta.FindPosition(10))
+    assert GetLocalOffsets(beta, executed) == [14]
+    assert GetLocalOffsets(beta, next_waits) == [21, 37]
+
+# Function to check the gosub targets of a mission with their callers and stack effects
+def test_gosub_targets():
+    graph = LoadScmControlFlow(TEXT_PATH).GetMissionGraph("Alpha")
+
+    assert graph.GetGosubTargets() == [{"label": "A_sub", "local_offset": 62, "callers": [0], "return_offsets": [7], "returns": True, "depth": 1, "instructions": 2}]
+
+# Function to check that the analysis can collect the control flow graphs in the same scan as the SCM data
+def test_analysis_collects_control_flow_in_same_scan(monkeypatch):
+    expected_waits_count, expected_waits, expected_stacks, _ = CollectScmData(TEXT_PATH)
+
+    # Counts the scans of the SCM file
+    scans = []
+    scan_scm_file = GrandTheftAutoSCMMissionsDataCollector.ScanScmFile
+    monkeypatch.setattr(GrandTheftAutoSCMMissionsDataCollector, "ScanScmFile", lambda *arguments: scans.append(arguments) or scan_scm_file(*arguments))
+
+    analysis = ScmAnalysis(TEXT_PATH, with_control_flow=True)
+    assert (analysis.waits_count, analysis.waits, analysis.mission_stacks) == (expected_waits_count, expected_waits, expected_stacks)
+    label_index = analysis.control_flow.GetLabelIndex()
+    assert len(scans) == 1
+    assert label_index == LoadScmControlFlow(TEXT_PATH).GetLabelIndex()
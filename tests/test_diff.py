@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from GrandTheftAutoSCMMissionsDataCollector import CollectScmData, DiffScmData, FindMatchingLocalOffsets, GetMissionInstructionRanges, GetTrivialDupesKeys, input_file_path
+
+# Function to get the keys of the trivial dupes cases of a SCM data from the full join
+def GetFullJoinKeys(scm_data):
+    return GetTrivialDupesKeys(FindMatchingLocalOffsets(scm_data[1], scm_data[3]))
+
+# Function to check that the new and lost trivial dupes of the diff (joining only the waits of the touched missions) are those of the full joins
+@pytest.mark.skipif(not os.path.exists(input_file_path), reason="GTA III SCM file not found")
+def test_diff_trivial_dupes_match_full_join(tmp_path):
+    # Copies the GTA III SCM file with a wait inserted in a mission and another mission renamed
+    with open(input_file_path, "rb") as file:
+        scm_data = file.read()
+    for old, new in [(b"{156306 44} 0004: $FIRE_TIME_LIMIT", b"{156306 44} 0001: wait 0 ms\n{156306 44} 0004: $FIRE_TIME_LIMIT"), (b"// Originally: Don't Spank My Bitch Up\n", b"// Originally: Don't Spank My Bitch Up Again\n")]:
+        assert scm_data.count(old) == 1
+        scm_data = scm_data.replace(old, new)
+    scm_path = str(tmp_path / "edited.txt")
+    with open(scm_path, "wb") as file:
+        file.write(scm_data)
+
+    old_data, new_data = CollectScmData(input_file_path), CollectScmData(scm_path)
+    diff = DiffScmData(old_data, new_data)
+    old_keys, new_keys = GetFullJoinKeys(old_data), GetFullJoinKeys(new_data)
+
+    assert diff["changed_missions"] == ["Firefighter"]
+    assert (diff["added_missions"], diff["removed_missions"]) == (["Don't Spank My Bitch Up Again"], ["Don't Spank My Bitch Up"])
+    assert diff["new_trivial_dupes"] and diff["lost_trivial_dupes"]
+    assert diff["new_trivial_dupes"] == sorted(new_keys - old_keys)
+    assert diff["lost_trivial_dupes"] == sorted(old_keys - new_keys)
+
+# Function to check that a SCM file diffed against itself has no differences
+@pytest.mark.skipif(not os.path.exists(input_file_path), reason="GTA III SCM file not found")
+def test_diff_same_file_reports_nothing():
+    scm_data = CollectScmData(input_file_path)
+    diff = DiffScmData(scm_data, scm_data)
+
+    assert diff["unchanged_missions"] == len(GetMissionInstructionRanges(scm_data[3]))
+    assert all(not diff[key] for key in ("changed_missions", "added_missions", "removed_missions", "waits", "added_missions_waits", "removed_missions_waits", "stacks", "new_trivial_dupes", "lost_trivial_dupes"))
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from GrandTheftAutoSCMMissionsDataCollector import AnalyseScmFile, AnalyseScmFileIncrementally, GetMissionBlockRanges, input_file_path
+
+# Reports written by the full and the incremental analysis
+REPORT_PATHS = [
+    os.path.join("Mission_Waits", "mission_waits_output.txt"),
+    os.path.join("Missions_Compatibilities", "missions_compatibilities_output.txt"),
+    os.path.join("Trivial_Dupes", "trivial_dupes_output.txt"),
+]
+
+# Function to read the reports of an output directory
+def ReadReports(output_dir):
+    reports = []
+    for report_path in REPORT_PATHS:
+        with open(os.path.join(output_dir, report_path), "rb") as file:
+            reports.append(file.read())
+    return reports
+
+# Function to replace a unique part of a SCM file
+def EditScmFile(scm_path, old, new):
+    with open(scm_path, "rb") as file:
+        scm_data = file.read()
+    assert scm_data.count(old) == 1
+    with open(scm_path, "wb") as file:
+        file.write(scm_data.replace(old, new))
+
+# Function to check that the incremental analysis writes the same reports as a full analysis after each edit of a SCM file (with a nameless mission block)
+@pytest.mark.skipif(not os.path.exists(input_file_path), reason="GTA III SCM file not found")
+def test_incremental_matches_full_analysis(tmp_path):
+    scm_path = str(tmp_path / "main.txt")
+    with open(input_file_path, "rb") as file:
+        scm_data = file.read()
+    with open(scm_path, "wb") as file:
+        file.write(scm_data.replace(b"//-------------Mission 30---------------\n// Originally: Taking Out The Laundry\n", b"//-------------Mission 30---------------\n"))
+
+    # Function to remove the block of Mission 40
+    def RemoveMissionBlock():
+        start, end = next((start, end) for start, end in GetMissionBlockRanges(scm_path) if scm_data[start:end].startswith(b"//-------------Mission 40-"))
+        EditScmFile(scm_path, scm_data[start:end], b"")
+
+    # Edits of the SCM file (the first run has none): the instruction after a wait, the stack of a mission, and a removed mission block
+    edits = [
+        lambda: None,
+        lambda: EditScmFile(scm_path, b"{156306 44} 0004: $FIRE_TIME_LIMIT", b"{156306 45} 0004: $FIRE_TIME_LIMIT"),
+        lambda: EditScmFile(scm_path, b"{208112 17} 00D6: if", b"{208112 18} 00D6: if"),
+        RemoveMissionBlock,
+    ]
+    previous_reports = None
+    for run_number, edit in enumerate(edits):
+        edit()
+        with open(scm_path, "rb") as file:
+            scm_data = file.read()
+        full_dir = str(tmp_path / f"full_{run_number}")
+        AnalyseScmFile(scm_path, full_dir)
+        _, _, summary = AnalyseScmFileIncrementally(scm_path, str(tmp_path / "incremental"), str(tmp_path / "cache"))
+
+        # Checks that the reports changed and are byte-identical to the full analysis
+        reports = ReadReports(str(tmp_path / "incremental"))
+        assert reports == ReadReports(full_dir)
+        assert summary["reparsed_blocks"] == (summary["blocks"] if run_number == 0 else int(run_number < 3))
+        assert reports != previous_reports
+        previous_reports = reports
@@ -0,0 +1,50 @@
+import glob
+import os
+import struct
+
+import pytest
+
+from GrandTheftAutoSCMMissionsDataCollector import CACHE_FILE_EXTENSION, CACHE_FORMAT_VERSION, CollectScmData, FindMatchingLocalOffsets, LoadScmData, input_file_path
+
+# Function to get the instruction columns of an index as lists
+def GetInstructionColumns(instruction_index):
+    return [list(column) for column in (instruction_index.global_offsets, instruction_index.local_offsets, instruction_index.opcodes, instruction_index.line_positions)] + [[instruction_index.GetMissionName(index) for index in range(len(instruction_index))]]
+
+# Function to check that the parse cache gives back the data of a fresh parse from its memory-mapped columns
+@pytest.mark.skipif(not os.path.exists(input_file_path), reason="GTA III SCM file not found")
+def test_cache_round_trip(tmp_path):
+    cache_dir = str(tmp_path)
+    expected_waits_count, expected_waits, expected_stacks, expected_index = CollectScmData(input_file_path)
+    expected_matching_offsets = FindMatchingLocalOffsets(expected_waits, expected_index)
+
+    # Parses the SCM file and stores it, then loads it from the cache
+    LoadScmData(input_file_path, cache_dir)
+    waits_count, waits, stacks, instruction_index = LoadScmData(input_file_path, cache_dir)
+
+    assert isinstance(instruction_index.global_offsets, memoryview)
+    assert (waits_count, waits, stacks) == (expected_waits_count, expected_waits, expected_stacks)
+    assert GetInstructionColumns(instruction_index) == GetInstructionColumns(expected_index)
+    assert FindMatchingLocalOffsets(waits, instruction_index) == expected_matching_offsets
+
+# Function to check that a cache file of another format version is parsed again
+@pytest.mark.skipif(not os.path.exists(input_file_path), reason="GTA III SCM file not found")
+def test_cache_version_mismatch_parses_again(tmp_path):
+    cache_dir = str(tmp_path)
+    LoadScmData(input_file_path, cache_dir)
+
+    # Changes the format version of the cache file (after the 8 bytes magic)
+    cache_path, = glob.glob(os.path.join(cache_dir, "*" + CACHE_FILE_EXTENSION))
+    with open(cache_path, "r+b") as file:
+        file.seek(8)
+        file.write(struct.pack("<I", CACHE_FORMAT_VERSION - 1))
+
+    waits_count, waits, stacks, instruction_index = LoadScmData(input_file_path, cache_dir)
+    expected_waits_count, expected_waits, expected_stacks, expected_index = CollectScmData(input_file_path)
+
+    assert not isinstance(instruction_index.global_offsets, memoryview)
+    assert (waits_count, waits, stacks) == (expected_waits_count, expected_waits, expected_stacks)
+    assert GetInstructionColumns(instruction_index) == GetInstructionColumns(expected_index)
+
+    # Checks that the cache file was stored again with the current version
+    with open(cache_path, "rb") as file:
+        assert struct.unpack_from("<I", file.read(12), 8)[0] == CACHE_FORMAT_VERSION
@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from GrandTheftAutoSCMMissionsDataCollector import CollectScmData, ParseScmFile, input_file_path
+
+# Function to copy the GTA III SCM file without the name line of a mission block (the block then has no mission name)
+def WriteNamelessMissionCopy(output_path, mission_header=b"//-------------Mission 30---------------\n"):
+    with open(input_file_path, "rb") as file:
+        scm_data = file.read()
+    header_position = scm_data.index(mission_header)
+    name_end = scm_data.index(b"\n", header_position + len(mission_header)) + 1
+    with open(output_path, "wb") as file:
+        file.write(scm_data[:header_position + len(mission_header)] + scm_data[name_end:])
+
+# Function to check that the mission blocks parsed on many workers give the same data as a single scan, even with a nameless mission block
+@pytest.mark.skipif(not os.path.exists(input_file_path), reason="GTA III SCM file not found")
+def test_sharded_parse_matches_single_scan(tmp_path):
+    scm_path = str(tmp_path / "nameless_mission.txt")
+    WriteNamelessMissionCopy(scm_path)
+    expected_waits_count, expected_waits, expected_stacks, expected_index = CollectScmData(scm_path)
+    waits_count, waits, stacks, instruction_index = ParseScmFile(scm_path, 64)
+
+    assert "Unknown Mission" in {mission_name for _, _, mission_name in expected_waits}
+    assert (waits_count, waits, stacks) == (expected_waits_count, expected_waits, expected_stacks)
+    assert [instruction_index.GetMissionName(index) for index in range(len(instruction_index))] == [expected_index.GetMissionName(index) for index in range(len(expected_index))]
+    assert (instruction_index.global_offsets, instruction_index.local_offsets, instruction_index.opcodes, instruction_index.line_positions) == (expected_index.global_offsets, expected_index.local_offsets, expected_index.opcodes, expected_index.line_positions)
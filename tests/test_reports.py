@@ -0,0 +1,17 @@
+from GrandTheftAutoSCMMissionsDataCollector import FormatResults, FormatTrivialDupesSections
+
+# Trivial dupe case whose matching mission has no stack
+WAIT = ((100, 10), (104, 14), "Mission A")
+CASE = (WAIT, ((500, 14), None, "Unknown Mission"))
+
+# Function to check that the console results format a match in a mission without a stack
+def test_results_with_mission_without_stack():
+    text = "".join(FormatResults([WAIT], 1, {14: [CASE]}, {"Mission A": 7}))
+
+    assert "Matches With (Mission: Unknown Mission):\n      Mission Stack (Local Offset after first gosub): None\n" in text
+
+# Function to check that the trivial dupes report formats a match in a mission without a stack
+def test_report_with_mission_without_stack():
+    text = "".join(FormatTrivialDupesSections({14: [CASE]}, {"Mission A": 7}))
+
+    assert "Matches With (Mission: Unknown Mission, Stack: None):\n" in text
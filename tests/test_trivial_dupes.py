@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from GrandTheftAutoSCMMissionsDataCollector import CollectScmData, FindMatchingLocalOffsets, GetMissionBlockRanges, input_file_path
+
+# Function to parse the first mission blocks of the GTA III SCM file (small enough for the brute force join)
+def ParseFirstMissions(missions_count=12):
+    mission_ranges = GetMissionBlockRanges(input_file_path)[1:missions_count + 1]
+    return CollectScmData(input_file_path, mission_ranges[0][0], mission_ranges[-1][1])
+
+# Function to join every wait with every instruction of another mission at the same local offset, comparing all the pairs
+def BruteForceJoin(waitsresults, instruction_index, mission_stacks=None):
+    # Dictionary to store the matching local offsets
+    offsets_matches = {}
+
+    # Compares each wait with each instruction (in file order)
+    for wait in waitsresults:
+        for index in range(len(instruction_index)):
+            matching_mission_name = instruction_index.GetMissionName(index)
+            if instruction_index.local_offsets[index] != wait[1][1] or matching_mission_name == wait[2]:
+                continue
+            if mission_stacks is not None and mission_stacks.get(matching_mission_name) != mission_stacks.get(wait[2]):
+                continue
+            offsets_matches.setdefault(wait[1][1], []).append((wait, ((instruction_index.global_offsets[index], instruction_index.local_offsets[index]), None, matching_mission_name)))
+
+    # Returns the dictionary with the matching local offsets
+    return offsets_matches
+
+# Function to check that the sorted local offset join finds the same matches as the brute force join
+@pytest.mark.skipif(not os.path.exists(input_file_path), reason="GTA III SCM file not found")
+def test_join_matches_brute_force():
+    _, waitsresults, mission_stacks, instruction_index = ParseFirstMissions()
+    expected = BruteForceJoin(waitsresults, instruction_index)
+
+    assert expected
+    assert FindMatchingLocalOffsets(waitsresults, instruction_index, mission_stacks) == expected
+
+# Function to check that the stack filter keeps only the matches between missions of the same stack
+@pytest.mark.skipif(not os.path.exists(input_file_path), reason="GTA III SCM file not found")
+def test_compatible_stacks_filter():
+    _, waitsresults, mission_stacks, instruction_index = ParseFirstMissions()
+    expected = BruteForceJoin(waitsresults, instruction_index, mission_stacks)
+    matching_offsets = FindMatchingLocalOffsets(waitsresults, instruction_index, mission_stacks, compatible_stacks_only=True)
+
+    assert matching_offsets == expected
+    assert sum(map(len, matching_offsets.values())) < sum(map(len, FindMatchingLocalOffsets(waitsresults, instruction_index).values()))
+
+# Function to check that the stack filter can't run without the mission stacks
+def test_compatible_stacks_filter_needs_stacks():
+    with pytest.raises(ValueError):
+        FindMatchingLocalOffsets([], None, compatible_stacks_only=True)